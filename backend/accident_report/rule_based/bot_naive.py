@@ -1,21 +1,30 @@
+import hashlib
+import io
 import json
 import os
 import re
-from typing import Annotated, Dict, Any, Optional, List
+import sys
+from dataclasses import dataclass
+from typing import Annotated, Dict, Any, Optional, List, Tuple
 from typing_extensions import TypedDict
 
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.types import Command, interrupt
 from langchain_core.messages import HumanMessage, AIMessage
 from typing import Literal
+try:
+    import orjson
+except ImportError:  # Optional: completed forms are written with stdlib json instead
+    orjson = None
 try:
     from .validator import validate_answer
-    from .ui_components import create_ui_message_for_question, parse_ui_response
+    from .ui_components import create_ui_message_for_question, create_ui_message_template, dumps_ui_message, parse_ui_response
     from .navigation_analyzer import get_navigation_strategy
 except ImportError:
     from validator import validate_answer
-    from ui_components import create_ui_message_for_question, parse_ui_response
+    from ui_components import create_ui_message_for_question, create_ui_message_template, dumps_ui_message, parse_ui_response
     from navigation_analyzer import get_navigation_strategy
 
 
@@ -24,7 +33,7 @@ class FormState(TypedDict):
     current_question_id: str
     current_question_index: int
     form_data: Dict[str, Any]
-    questions_completed: List[str]
+    questions_completed: Dict[str, int]  # question_id -> completion order (insertion-ordered)
     retry_count: int
     last_error: Optional[str]
     form_complete: bool
@@ -39,12 +48,148 @@ class FormState(TypedDict):
     current_repeat_field_index: int  # Which field within current instance
     repeat_group_data: List[Dict[str, Any]]  # List of completed instances
     current_instance_data: Dict[str, Any]  # Data for current instance being filled
+    current_repeat_expected: int  # How many instances to collect (0 until the repeat group is entered)
     # For navigation/going back functionality
     navigation_request: bool  # Whether user wants to navigate to a previous question
     target_question_id: Optional[str]  # The question they want to go back to
-    question_history: List[Dict[str, Any]]  # History of completed questions for navigation
     # For web UI components
     web_ui_enabled: bool  # Whether to generate UI components for web interface
+    # Hash of the last question block printed, so retries only re-print the error
+    last_prompt_hash: Optional[str]
+
+
+# Question types that are answered by picking from "options"
+_CHOICE_TYPES = frozenset({"single_choice", "multiple_choice"})
+
+# Phrases that mean the user wants to change a previous reply
+_NAVIGATION_PHRASES = (
+    'change reply',
+    'change answer',
+    'edit reply',
+    'edit answer',
+    'modify reply',
+    'modify answer',
+    'change my reply',
+    'change my answer'
+)
+# All phrases in one pattern, so detection is a single scan of the message
+_NAVIGATION_RE = re.compile("|".join(map(re.escape, _NAVIGATION_PHRASES)), re.IGNORECASE)
+
+# Answers to a "how many" choice question that are read as an instance count
+_COUNT_CHOICES = frozenset({"1", "2", "3"})
+
+# Decimal strings for list numbering, so rendering doesn't format each index
+_NUM_STR = tuple(str(i) for i in range(256))
+
+# Upper bound on cached serialized UI messages per workflow
+_UI_PAYLOAD_CACHE_SIZE = 256
+
+# Console separators
+_SEP_EQ = "=" * 60
+_SEP_DASH = "-" * 30
+_SEP_QUESTION = "-" * 40
+_SEP_BOX = "─" * 50
+
+# Format hint printed under a regular question, by question type
+_TYPE_HINT: Dict[str, str] = {
+    "date": "(Format: YYYY-MM-DD, e.g., 2025-06-12)",
+    "time": "(Format: HH:MM, e.g., 14:35)",
+    "number": "(Please enter a number)",
+    "boolean": "(Please answer: yes/no, true/false, or 1/0)",
+}
+
+# Format hint printed under the first field of a repeat group, by field type
+_FIRST_FIELD_HINT: Dict[str, str] = {
+    "text": "   (Example: 'Sedan / Toyota / Camry' or 'SUV / Honda / CR-V')",
+    "number": "   (Please enter a number)",
+    "date": "   (Format: YYYY-MM-DD, e.g., 2025-06-12)",
+    "time": "   (Format: HH:MM, e.g., 14:35)",
+}
+
+# Parsed questionnaires keyed by absolute path -> (mtime_ns, data), shared by
+# every FormWorkflow in the process (one per web bot session)
+_QUESTIONS_CACHE: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+
+def _load_questions_data(questions_file: str) -> Dict[str, Any]:
+    """Load a questions JSON file, reusing the parsed copy while the file is unchanged."""
+    mtime = os.stat(questions_file).st_mtime_ns
+    cached = _QUESTIONS_CACHE.get(questions_file)
+    if cached is None or cached[0] != mtime:
+        with open(questions_file, 'r') as f:
+            data = json.load(f)
+        _intern_question_ids(data.get("questions", []))
+        cached = (mtime, data)
+        _QUESTIONS_CACHE[questions_file] = cached
+    return cached[1]
+
+
+def _intern_question_ids(questions: List[Dict[str, Any]]):
+    """Intern question, field and follow-up IDs so ID lookups and comparisons can short-circuit on identity."""
+    for question in questions:
+        question["id"] = sys.intern(question["id"])
+        _intern_question_ids(question.get("fields", ()))
+        if "followup_if_yes" in question:
+            _intern_question_ids((question["followup_if_yes"],))
+
+
+@dataclass(frozen=True, slots=True)
+class _RouteInfo:
+    """The parts of a question definition the routers read on every transition."""
+    followup_id: Optional[str]  # Set for boolean questions with followup_if_yes
+    
+    @classmethod
+    def of(cls, question: Dict[str, Any]) -> "_RouteInfo":
+        if question["type"] == "boolean" and "followup_if_yes" in question:
+            return cls(question["followup_if_yes"]["id"])
+        return cls(None)
+
+
+def _materialize_followup(followup: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a follow-up question definition, converting table questions for text entry."""
+    followup = followup.copy()
+    # Convert table questions to multiline_text for user-friendliness
+    if followup["type"] == "table":
+        followup["type"] = "multiline_text"
+        followup["question"] = followup["question"] + "\n(Please provide details separated by commas or semicolons)"
+    return followup
+
+
+def _count_from_answer(answer: Any, default: int = 2) -> int:
+    """Read an instance count from a "how many" choice answer, falling back to default."""
+    if isinstance(answer, dict) and "choice" in answer:
+        if answer["choice"] in _COUNT_CHOICES:
+            return int(answer["choice"])
+    elif isinstance(answer, str):
+        if answer in _COUNT_CHOICES:
+            return int(answer)
+    return default
+
+
+def _num(i: int) -> str:
+    """Return str(i), from the _NUM_STR table for small indexes."""
+    return _NUM_STR[i] if i < 256 else str(i)
+
+
+def _identity_parser(user_input: str) -> Tuple[str, None]:
+    """Stand-in for parse_ui_response when the web UI is disabled."""
+    return user_input, None
+
+
+def _format_answer(answer: Any) -> str:
+    """Format a stored answer for the form summary (empty for an empty dict/list)."""
+    if isinstance(answer, dict):
+        return "\n".join(f"  {key}: {value}" for key, value in answer.items())
+    if isinstance(answer, list):
+        return "\n".join(f"  {_num(i)}. {item}" for i, item in enumerate(answer, 1))
+    return f"  Answer: {answer}"
+
+
+def _mark_completed(completed: Dict[str, int], question_id: str) -> Dict[str, int]:
+    """Return questions_completed with question_id appended, copying only if it's new."""
+    if question_id in completed:
+        return completed
+    return {**completed, question_id: len(completed)}
 
 
 class FormWorkflow:
@@ -68,22 +213,92 @@ class FormWorkflow:
         if not os.path.exists(questions_file):
             raise FileNotFoundError(f"Questions file not found at: {questions_file}")
             
-        with open(questions_file, 'r') as f:
-            self.questions_data = json.load(f)
+        self.questions_data = _load_questions_data(questions_file)
         self.questions = self.questions_data["questions"]
+        self._total_questions = len(self.questions)
+        self._last_q_index = self._total_questions - 1
+        # Question IDs as a flat column, indexed like self.questions / current_question_index
+        self._qids = [q["id"] for q in self.questions]
+        # ID and type lookups for main questions, plus an ID lookup for follow-ups
+        self.questions_by_id = {q["id"]: q for q in self.questions}
+        self.questions_by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for q in self.questions:
+            self.questions_by_type.setdefault(q["type"], []).append(q)
+        self._idx_by_id = {qid: i for i, qid in enumerate(self._qids)}
+        self._followup_by_id = {
+            q["followup_if_yes"]["id"]: _materialize_followup(q["followup_if_yes"])
+            for q in self.questions if "followup_if_yes" in q
+        }
+        # Slotted routing records for every main and follow-up question
+        self._route_info = {qid: _RouteInfo.of(q) for qid, q in self.questions_by_id.items()}
+        self._route_info.update((qid, _RouteInfo.of(q)) for qid, q in self._followup_by_id.items())
+        # Which optional question shapes this form uses; the routers skip the checks for absent ones
+        self._has_group = "group" in self.questions_by_type
+        self._has_repeat = "repeat_group" in self.questions_by_type
         self.interactive = interactive
         self.web_ui_enabled = web_ui_enabled
+        # Server-side web UI sessions render their own messages, so console output is dropped
+        self._console = interactive or not web_ui_enabled
+        # Only web UI replies carry component payloads; plain text is used as-is
+        self._parse_ui = parse_ui_response if web_ui_enabled else _identity_parser
+        # Static UI message parts keyed by (question_id, field_id, repeat instance)
+        self._ui_templates: Dict[Tuple, Dict[str, Any]] = {}
+        if web_ui_enabled:
+            self._precompute_ui_templates()
+        # Serialized UI messages keyed by (template, progress, completed questions)
+        self._ui_payloads: Dict[Tuple, str] = {}
+        # Static text prompts keyed the same way; only interactive/text mode prints them
+        self._prompts: Dict[Tuple, str] = {}
+        if not web_ui_enabled:
+            self._precompute_prompts()
         self.graph_builder = StateGraph(FormState)
         self.memory = InMemorySaver()
         self._build_graph()
         
+    def _precompute_ui_templates(self):
+        """Build the static UI message template of every question and field."""
+        for question in self.questions:
+            if question["type"] == "group":
+                for field in question["fields"]:
+                    self._get_ui_template(question, field)
+            elif question["type"] == "repeat_group":
+                for field in question["fields"]:
+                    self._get_ui_template(question, field, 0)
+            else:
+                self._get_ui_template(question, None)
+            
+            if "followup_if_yes" in question:
+                followup = self.get_followup_question_by_id(question["followup_if_yes"]["id"])
+                self._get_ui_template(followup, None)
+    
+    def _get_ui_template(self, question_def: Dict[str, Any], field: Optional[Dict[str, Any]],
+                         instance_index: Optional[int] = None) -> Dict[str, Any]:
+        """Return the cached UI message template for a question/field, building it on first use.
+        
+        Repeat group fields pass their instance index; the "Vehicle N - " field copy is only
+        made when that instance's template is first built.
+        """
+        key = (question_def["id"], field["id"] if field else None, instance_index)
+        template = self._ui_templates.get(key)
+        if template is None:
+            if instance_index is not None:
+                # Modify field question to include vehicle number
+                field = dict(field)  # Make a copy
+                field["question"] = f"Vehicle {instance_index + 1} - {field['question']}"
+            template = self._ui_templates[key] = create_ui_message_template(question_def, field)
+        return template
+    
+    def _write(self, text: str):
+        """Write console output in a single call (no-op for server-side web UI sessions)."""
+        if self._console:
+            sys.stdout.write(text)
+    
     def _build_graph(self):
         """Build the LangGraph workflow."""
         # Add nodes
         self.graph_builder.add_node("start_form", self.start_form)
         self.graph_builder.add_node("ask_question", self.ask_question)
-        self.graph_builder.add_node("get_user_input", 
-                                   self.get_user_input if self.interactive else self.noop_input)
+        self.graph_builder.add_node("get_user_input", self.get_user_input)
         self.graph_builder.add_node("check_navigation", self.check_navigation)
         self.graph_builder.add_node("handle_navigation", self.handle_navigation)
         self.graph_builder.add_node("validate_input", self.validate_input)
@@ -97,24 +312,14 @@ class FormWorkflow:
         self.graph_builder.add_edge(START, "start_form")
         self.graph_builder.add_edge("start_form", "ask_question")
         
-        # In interactive mode: ask_question -> get_user_input -> check_navigation -> validate_input
-        # In web mode: ask_question -> END (pause and wait for external input)
-        if self.interactive:
-            self.graph_builder.add_edge("ask_question", "get_user_input")
-            self.graph_builder.add_edge("get_user_input", "check_navigation")
-            
-            # Add conditional edge from check_navigation
-            self.graph_builder.add_conditional_edges(
-                "check_navigation",
-                self.route_after_navigation_check,
-                {
-                    "navigate": "handle_navigation",
-                    "validate": "validate_input"
-                }
-            )
-            
-            self.graph_builder.add_edge("handle_navigation", "ask_question")
-        # In web mode, we'll manually resume from check_navigation when we get user input
+        # ask_question -> get_user_input -> check_navigation -> validate_input
+        # In web mode get_user_input suspends the graph with interrupt() and the
+        # web layer resumes it with Command(resume=user_text)
+        self.graph_builder.add_edge("ask_question", "get_user_input")
+        self.graph_builder.add_edge("get_user_input", "check_navigation")
+        # check_navigation routes itself to handle_navigation/validate_input via Command
+        
+        self.graph_builder.add_edge("handle_navigation", "ask_question")
         
         self.graph_builder.add_edge("advance_to_next", "ask_question")
         self.graph_builder.add_edge("handle_group_question", "ask_question")
@@ -140,6 +345,7 @@ class FormWorkflow:
             "handle_followup",
             self.route_after_followup,
             {
+                "ask_followup": "ask_question",
                 "next_question": "advance_to_next",
                 "complete": "complete_form"
             }
@@ -170,85 +376,63 @@ class FormWorkflow:
         
     def get_question_by_id(self, question_id: str) -> Optional[Dict[str, Any]]:
         """Get question definition by ID."""
-        # First check main questions
-        for q in self.questions:
-            if q["id"] == question_id:
-                return q
-        
-        # Then check follow-up questions
-        return self.get_followup_question_by_id(question_id)
+        # First check main questions, then follow-up questions
+        question = self.questions_by_id.get(question_id)
+        if question is not None:
+            return question
+        return self._followup_by_id.get(question_id)
+    
+    def _index_of(self, question_id: str) -> Optional[int]:
+        """Get the index of a main question, or None for unknown/follow-up IDs."""
+        return self._idx_by_id.get(question_id)
     
     def get_next_question(self, current_index: int) -> Optional[Dict[str, Any]]:
         """Get the next question in sequence."""
-        if current_index + 1 < len(self.questions):
+        if current_index < self._last_q_index:
             return self.questions[current_index + 1]
         return None
     
-    def noop_input(self, state: FormState) -> FormState:
-        """Web mode: do NOT read from stdin, just pause."""
-        return state
-    
     def _detect_navigation_intent(self, user_input: str) -> bool:
         """Detect if user wants to change a previous reply."""
-        user_input = user_input.lower().strip()
-        
-        # Simple navigation phrases
-        navigation_phrases = [
-            'change reply',
-            'change answer',
-            'edit reply',
-            'edit answer',
-            'modify reply',
-            'modify answer',
-            'change my reply',
-            'change my answer'
-        ]
-        
-        return any(phrase in user_input for phrase in navigation_phrases)
+        return _NAVIGATION_RE.search(user_input) is not None
     
-    def check_navigation(self, state: FormState) -> FormState:
-        """Check if user wants to change a previous reply."""
+    def check_navigation(self, state: FormState) -> Command[Literal["handle_navigation", "validate_input"]]:
+        """Check if user wants to change a previous reply and route accordingly."""
         if not state["messages"]:
-            return state
+            return Command(goto="validate_input")
         
         last_message = state["messages"][-1]
         user_input = last_message.content
         
-        # Check if this is a change reply request
-        if self._detect_navigation_intent(user_input):
-            return {
-                **{k: v for k, v in state.items() if k not in [
-                    "navigation_request", "target_question_id"
-                ]},
-                "navigation_request": True,
-                "target_question_id": None
-            }
+        # Check if this is a change reply request. The question list is picked from on the
+        # console, so web sessions (interrupt mode) take the text as a normal answer
+        if self.interactive and self._detect_navigation_intent(user_input):
+            return Command(
+                update={"navigation_request": True, "target_question_id": None},
+                goto="handle_navigation"
+            )
         
         # No navigation intent detected, proceed with normal validation
-        return {
-            **{k: v for k, v in state.items() if k not in [
-                "navigation_request", "target_question_id"
-            ]},
-            "navigation_request": False,
-            "target_question_id": None
-        }
+        return Command(
+            update={"navigation_request": False, "target_question_id": None},
+            goto="validate_input"
+        )
     
     def handle_navigation(self, state: FormState) -> FormState:
         """Handle request to change a previous reply."""
         if not state["questions_completed"]:
-            print("📝 No previous questions to change. Continuing with current question.")
+            self._write("📝 No previous questions to change. Continuing with current question.\n")
             return {
-                **{k: v for k, v in state.items() if k not in [
-                    "navigation_request", "target_question_id"
-                ]},
                 "navigation_request": False,
                 "target_question_id": None
             }
         
         # Show completed questions for user to choose from
-        print("\n🔄 Which question would you like to change?")
-        print("Here are the questions you've already answered:")
-        print("-" * 50)
+        lines = [
+            "\n🔄 Which question would you like to change?",
+            "Here are the questions you've already answered:",
+            "-" * 50,
+        ]
         
         for i, q_id in enumerate(state["questions_completed"], 1):
             question = self.get_question_by_id(q_id)
@@ -267,22 +451,20 @@ class FormWorkflow:
                 else:
                     display_answer = str(current_answer)
                 
-                print(f"{i}. {question['question']}")
-                print(f"   Current answer: {display_answer}")
-                print()
+                lines.append(f"{i}. {question['question']}")
+                lines.append(f"   Current answer: {display_answer}")
+                lines.append("")
         
-        print("Type the number of the question you want to change, or 'cancel' to continue:")
+        lines.append("Type the number of the question you want to change, or 'cancel' to continue:")
+        self._write("\n".join(lines) + "\n")
         
         # In interactive mode, get user choice
         if self.interactive:
             choice = input("\n👤 Your choice: ").strip()
             
             if choice.lower() == 'cancel':
-                print("📝 Continuing with current question...")
+                self._write("📝 Continuing with current question...\n")
                 return {
-                    **{k: v for k, v in state.items() if k not in [
-                        "navigation_request", "target_question_id"
-                    ]},
                     "navigation_request": False,
                     "target_question_id": None
                 }
@@ -290,37 +472,27 @@ class FormWorkflow:
             try:
                 choice_num = int(choice)
                 if 1 <= choice_num <= len(state["questions_completed"]):
-                    target_question_id = state["questions_completed"][choice_num - 1]
+                    target_question_id = list(state["questions_completed"])[choice_num - 1]
                     
                     # Navigate to the selected question
                     target_question = self.get_question_by_id(target_question_id)
                     if target_question:
                         # Find the index of this question
-                        target_index = None
-                        for i, q in enumerate(self.questions):
-                            if q["id"] == target_question_id:
-                                target_index = i
-                                break
+                        target_index = self._index_of(target_question_id)
                         
                         if target_index is not None:
-                            print(f"\n🔄 Editing: {target_question['question']}")
                             current_answer = state["form_data"].get(target_question_id, "No answer")
-                            print(f"Current answer: {current_answer}")
-                            print("Please provide your new answer:")
+                            self._write(
+                                f"\n🔄 Editing: {target_question['question']}\n"
+                                f"Current answer: {current_answer}\n"
+                                "Please provide your new answer:\n"
+                            )
                             
                             # Remove this question from completed list so it can be re-answered
-                            new_completed = [q_id for q_id in state["questions_completed"] if q_id != target_question_id]
+                            new_completed = {q_id: order for q_id, order in state["questions_completed"].items() if q_id != target_question_id}
                             
                             # Reset to the target question
                             return {
-                                **{k: v for k, v in state.items() if k not in [
-                                    "current_question_id", "current_question_index", "questions_completed",
-                                    "current_group_question", "current_group_field_index", "group_data",
-                                    "current_repeat_group_question", "current_repeat_instance", 
-                                    "current_repeat_field_index", "repeat_group_data", "current_instance_data",
-                                    "retry_count", "last_error", "validation_success", 
-                                    "navigation_request", "target_question_id"
-                                ]},
                                 "current_question_id": target_question_id,
                                 "current_question_index": target_index,
                                 "questions_completed": new_completed,
@@ -332,6 +504,7 @@ class FormWorkflow:
                                 "current_repeat_field_index": 0,
                                 "repeat_group_data": [],
                                 "current_instance_data": {},
+                                "current_repeat_expected": 0,
                                 "retry_count": 0,
                                 "last_error": None,
                                 "validation_success": False,
@@ -339,39 +512,32 @@ class FormWorkflow:
                                 "target_question_id": None
                             }
                 else:
-                    print("❌ Invalid choice. Continuing with current question.")
+                    self._write("❌ Invalid choice. Continuing with current question.\n")
             except ValueError:
-                print("❌ Please enter a number. Continuing with current question.")
+                self._write("❌ Please enter a number. Continuing with current question.\n")
         
         # Return to current question if navigation failed
         return {
-            **{k: v for k, v in state.items() if k not in [
-                "navigation_request", "target_question_id"
-            ]},
             "navigation_request": False,
             "target_question_id": None
         }
     
-    def route_after_navigation_check(self, state: FormState) -> Literal["navigate", "validate"]:
-        """Route after checking for navigation intent."""
-        if state.get("navigation_request", False):
-            return "navigate"
-        return "validate"
-    
     def start_form(self, state: FormState) -> FormState:
         """Initialize the form session."""
-        print(f"\n🏁 Welcome to the {self.questions_data['title']}")
-        print("=" * 60)
-        print("I'll guide you through filling out this form step by step.")
-        print("Please answer each question as accurately as possible.")
-        print("\n💡 Pro tip: If you want to change a previous answer, just type 'change reply'")
-        print("=" * 60)
+        self._write(
+            f"\n🏁 Welcome to the {self.questions_data['title']}\n"
+            f"{_SEP_EQ}\n"
+            "I'll guide you through filling out this form step by step.\n"
+            "Please answer each question as accurately as possible.\n"
+            "\n💡 Pro tip: If you want to change a previous answer, just type 'change reply'\n"
+            f"{_SEP_EQ}\n"
+        )
         
         return {
             "current_question_id": self.questions[0]["id"],
             "current_question_index": 0,
             "form_data": {},
-            "questions_completed": [],
+            "questions_completed": {},
             "retry_count": 0,
             "last_error": None,
             "form_complete": False,
@@ -384,28 +550,54 @@ class FormWorkflow:
             "current_repeat_field_index": 0,
             "repeat_group_data": [],
             "current_instance_data": {},
+            "current_repeat_expected": 0,
             "navigation_request": False,
             "target_question_id": None,
-            "question_history": [],
-            "web_ui_enabled": self.web_ui_enabled
+            "web_ui_enabled": self.web_ui_enabled,
+            "last_prompt_hash": None
         }
     
     def ask_question(self, state: FormState) -> FormState:
         """Display the current question to the user."""
         # Check if we should generate UI components for web interface
+        # Web UI messages are always sent in full: the frontend only enables
+        # the clickable component on the latest bot message
         if state.get("web_ui_enabled", False):
             return self._ask_question_with_ui(state)
+        
+        prompt_hash = self._prompt_hash(state)
+        if state["retry_count"] > 0 and state["last_error"] and prompt_hash == state.get("last_prompt_hash"):
+            # The same question block is still on screen, only show the new error
+            self._write(f"\n❌ {state['last_error']}\nPlease try again.\n")
+            return {}
+        
+        self._ask_question_text_only(state)
+        return {"last_prompt_hash": prompt_hash}
+    
+    def _prompt_hash(self, state: FormState) -> str:
+        """Identify the question block that ask_question would print for this state."""
+        if state.get("current_repeat_group_question"):
+            key = (state["current_question_id"], "repeat",
+                   state.get("current_repeat_instance", 0), state.get("current_repeat_field_index", 0))
+        elif state.get("current_group_question"):
+            key = (state["current_question_id"], "group", state.get("current_group_field_index", 0))
         else:
-            return self._ask_question_text_only(state)
+            key = (state["current_question_id"],)
+        return hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
     
     def _ask_question_with_ui(self, state: FormState) -> FormState:
         """Ask question with UI components for web interface."""
         # Determine what question/field we're currently asking
         current_field = None
         question_def = None
-        progress_info = None
         retry_info = None
         
+        # Progress info is shared by all branches; sub-questions add sub_progress
+        progress_info = {
+            "current": len(state["questions_completed"]) + 1,
+            "total": self._total_questions
+        }
+        
         # Handle retry information
         if state["retry_count"] > 0 and state["last_error"]:
             retry_info = {"error": state["last_error"]}
@@ -420,19 +612,9 @@ class FormWorkflow:
             if field_index < len(repeat_group["fields"]):
                 current_field = repeat_group["fields"][field_index]
                 question_def = repeat_group
+                template = self._get_ui_template(repeat_group, current_field, instance_index)
                 
-                # Modify field question to include vehicle number
-                current_field = dict(current_field)  # Make a copy
-                current_field["question"] = f"Vehicle {instance_index + 1} - {current_field['question']}"
-                
-                # Set progress info
-                progress = len(state["questions_completed"])
-                total = len(self.questions)
-                progress_info = {
-                    "current": progress + 1,
-                    "total": total,
-                    "sub_progress": f"Vehicle {instance_index + 1}, part {field_index + 1}/{len(repeat_group['fields'])}"
-                }
+                progress_info["sub_progress"] = f"Vehicle {instance_index + 1}, part {field_index + 1}/{len(repeat_group['fields'])}"
         
         elif state.get("current_group_question") and state.get("current_group_field_index", 0) < len(state["current_group_question"]["fields"]):
             # In the middle of a group question
@@ -440,56 +622,53 @@ class FormWorkflow:
             field_index = state["current_group_field_index"]
             current_field = group_question["fields"][field_index]
             question_def = group_question
+            template = self._get_ui_template(group_question, current_field)
             
-            # Set progress info
-            progress = len(state["questions_completed"])
-            total = len(self.questions)
-            progress_info = {
-                "current": progress + 1,
-                "total": total,
-                "sub_progress": f"part {field_index + 1}/{len(group_question['fields'])}"
-            }
+            progress_info["sub_progress"] = f"part {field_index + 1}/{len(group_question['fields'])}"
         
         else:
             # Regular question or start of group/repeat_group question
             question_def = self.get_question_by_id(state["current_question_id"])
             if not question_def:
-                return state
-            
-            # Set progress info
-            progress = len(state["questions_completed"])
-            total = len(self.questions)
-            progress_info = {
-                "current": progress + 1,
-                "total": total
-            }
+                return {}
             
             # For group and repeat_group questions, show the first field
             if question_def["type"] == "group":
                 current_field = question_def["fields"][0]
+                template = self._get_ui_template(question_def, current_field)
             elif question_def["type"] == "repeat_group":
                 current_field = question_def["fields"][0]
-                # Modify field question to include vehicle number
-                current_field = dict(current_field)  # Make a copy
-                current_field["question"] = f"Vehicle 1 - {current_field['question']}"
+                template = self._get_ui_template(question_def, current_field, 0)
             else:
                 current_field = None  # Use the main question definition
+                template = self._get_ui_template(question_def, None)
         
         # Create UI message
         try:
-            ui_message = create_ui_message_for_question(
-                question_def=question_def,
-                current_field=current_field,
-                progress_info=progress_info,
-                retry_info=retry_info,
-                completed_questions=state.get("questions_completed", [])
+            completed_questions = state.get("questions_completed", {})
+            # Retry prompts carry a per-reply error message, so only plain prompts are cached
+            payload_key = None if retry_info else (
+                id(template), progress_info["current"], progress_info["total"],
+                progress_info.get("sub_progress"), tuple(completed_questions)
             )
+            payload = self._ui_payloads.get(payload_key) if payload_key else None
+            if payload is None:
+                ui_message = create_ui_message_for_question(
+                    question_def=question_def,
+                    current_field=current_field,
+                    progress_info=progress_info,
+                    retry_info=retry_info,
+                    completed_questions=completed_questions,
+                    template=template
+                )
+                payload = dumps_ui_message(ui_message)
+                if payload_key:
+                    if len(self._ui_payloads) >= _UI_PAYLOAD_CACHE_SIZE:
+                        self._ui_payloads.clear()
+                    self._ui_payloads[payload_key] = payload
             
-            # Add the UI message to the state - this will be picked up by the bot integration
-            return {
-                **state,
-                "messages": state["messages"] + [AIMessage(content=json.dumps(ui_message))]
-            }
+            # add_messages appends the UI message; the bot integration picks it up from there
+            return {"messages": [AIMessage(content=payload)]}
             
         except Exception as e:
             # Fallback to text-only if UI generation fails
@@ -498,6 +677,7 @@ class FormWorkflow:
     
     def _ask_question_text_only(self, state: FormState) -> FormState:
         """Original ask_question method for text-only display."""
+        lines = []
         # Check if we're in the middle of a repeat group question
         if state.get("current_repeat_group_question"):
             repeat_group = state["current_repeat_group_question"]
@@ -509,42 +689,27 @@ class FormWorkflow:
                 
                 # Show progress for repeat group questions
                 progress = len(state["questions_completed"])
-                total = len(self.questions)
+                total = self._total_questions
                 instance_progress = f" (Vehicle {instance_index + 1}, part {field_index + 1}/{len(repeat_group['fields'])})"
-                print(f"\n📋 Question {progress + 1}/{total}{instance_progress}")
-                print("-" * 40)
+                lines.append(f"\n📋 Question {progress + 1}/{total}{instance_progress}")
+                lines.append(_SEP_QUESTION)
                 
                 # Display retry message if needed
                 if state["retry_count"] > 0 and state["last_error"]:
-                    print(f"❌ {state['last_error']}")
-                    print("Let me ask that again...\n")
+                    lines.append(f"❌ {state['last_error']}")
+                    lines.append("Let me ask that again...\n")
                 
-                print(f"❓ Vehicle {instance_index + 1} - {current_field['question']}")
-                print(f"   (Please provide details for just Vehicle {instance_index + 1})")
+                lines.append(f"❓ Vehicle {instance_index + 1} - {current_field['question']}")
+                lines.append(f"   (Please provide details for just Vehicle {instance_index + 1})")
                 
-                # Show format hints and options
-                if current_field["type"] == "text":
-                    if "type, make, and model" in current_field['question'].lower():
-                        print("   (Example: 'Sedan / Toyota / Camry' or 'SUV / Honda / CR-V')")
-                    elif "licence plate" in current_field['question'].lower():
-                        print("   (Example: 'ABC-1234' or 'XYZ-5678')")
-                    elif "damage" in current_field['question'].lower():
-                        print("   (Example: 'Front-left fender dented' or 'Rear bumper scratched')")
-                elif current_field["type"] == "number":
-                    if "speed" in current_field['question'].lower():
-                        print("   (Example: 30, 45, 60 - just the number in km/h)")
+                # Format hints and options don't depend on the vehicle number
+                hints = self._get_prompt((repeat_group["id"], current_field["id"], "repeat"),
+                                         self._render_repeat_field_hints, current_field)
+                if hints:
+                    lines.append(hints)
                 
-                # Show options for choice questions
-                if current_field["type"] in ["single_choice", "multiple_choice"]:
-                    print("Options:")
-                    for i, option in enumerate(current_field["options"], 1):
-                        print(f"  {i}. {option}")
-                    if current_field.get("other_specify"):
-                        print("  (You can also specify 'Other' with details)")
-                    if current_field["type"] == "multiple_choice":
-                        print("  (You can select multiple options separated by commas)")
-                        
-                return state
+                self._write("\n".join(lines) + "\n")
+                return {}
         
         # Check if we're in the middle of a group question
         elif state.get("current_group_question") and state.get("current_group_field_index", 0) < len(state["current_group_question"]["fields"]):
@@ -555,143 +720,156 @@ class FormWorkflow:
             
             # Show progress for group questions
             progress = len(state["questions_completed"])
-            total = len(self.questions)
+            total = self._total_questions
             group_progress = f" (part {field_index + 1}/{len(group_question['fields'])})"
-            print(f"\n📋 Question {progress + 1}/{total}{group_progress}")
-            print("-" * 40)
+            lines.append(f"\n📋 Question {progress + 1}/{total}{group_progress}")
+            lines.append(_SEP_QUESTION)
             
             # Display retry message if needed
             if state["retry_count"] > 0 and state["last_error"]:
-                print(f"❌ {state['last_error']}")
-                print("Let me ask that again...\n")
+                lines.append(f"❌ {state['last_error']}")
+                lines.append("Let me ask that again...\n")
                 
-            print(f"❓ {current_field['question']}")
-            
-            # Show options for choice questions
-            if current_field["type"] in ["single_choice", "multiple_choice"]:
-                print("Options:")
-                for i, option in enumerate(current_field["options"], 1):
-                    print(f"  {i}. {option}")
-                if current_field.get("other_specify"):
-                    print("  (You can also specify 'Other' with details)")
-                if current_field["type"] == "multiple_choice":
-                    print("  (You can select multiple options separated by commas)")
+            lines.append(self._get_prompt((group_question["id"], current_field["id"], None),
+                                          self._render_field_prompt, current_field))
         else:
             # Regular question or start of group/repeat_group question
             question = self.get_question_by_id(state["current_question_id"])
             if not question:
-                return state
+                return {}
             
             # Show progress
             progress = len(state["questions_completed"])
-            total = len(self.questions)
-            print(f"\n📋 Question {progress + 1}/{total}")
-            print("-" * 40)
+            total = self._total_questions
+            lines.append(f"\n📋 Question {progress + 1}/{total}")
+            lines.append(_SEP_QUESTION)
             
             # Display retry message if needed
             if state["retry_count"] > 0 and state["last_error"]:
-                print(f"❌ {state['last_error']}")
-                print("Let me ask that again...\n")
+                lines.append(f"❌ {state['last_error']}")
+                lines.append("Let me ask that again...\n")
             
-            # For repeat_group questions, show special instructions
-            if question["type"] == "repeat_group":
-                print(f"❓ {question['question']}")
-                print(f"💡 I'll ask you about each vehicle separately, one question at a time.")
-                print(f"📝 Let's start with Vehicle 1:")
-                # Start with the first field of the first instance
-                first_field = question["fields"][0]
-                print(f"\n❓ Vehicle 1 - {first_field['question']}")
-                print(f"   (Please provide details for just this one vehicle)")
-                
-                # Show options for choice questions
-                if first_field["type"] in ["single_choice", "multiple_choice"]:
-                    print("Options:")
-                    for i, option in enumerate(first_field["options"], 1):
-                        print(f"  {i}. {option}")
-                    if first_field.get("other_specify"):
-                        print("  (You can also specify 'Other' with details)")
-                    if first_field["type"] == "multiple_choice":
-                        print("  (You can select multiple options separated by commas)")
-                elif first_field["type"] == "text":
-                    print("   (Example: 'Sedan / Toyota / Camry' or 'SUV / Honda / CR-V')")
-                elif first_field["type"] == "number":
-                    print("   (Please enter a number)")
-                elif first_field["type"] == "date":
-                    print("   (Format: YYYY-MM-DD, e.g., 2025-06-12)")
-                elif first_field["type"] == "time":
-                    print("   (Format: HH:MM, e.g., 14:35)")
-            
-            # Check if this is a group question - if so, start with first field
-            elif question["type"] == "group":
-                print(f"❓ {question['question']}")
-                print(f"💡 I'll ask you each part of this question step by step.")
-                # Start with the first field
-                first_field = question["fields"][0]
-                print(f"\n❓ {first_field['question']}")
-                
-                # Show options for choice questions
-                if first_field["type"] in ["single_choice", "multiple_choice"]:
-                    print("Options:")
-                    for i, option in enumerate(first_field["options"], 1):
-                        print(f"  {i}. {option}")
-                    if first_field.get("other_specify"):
-                        print("  (You can also specify 'Other' with details)")
-                    if first_field["type"] == "multiple_choice":
-                        print("  (You can select multiple options separated by commas)")
-            else:
-                # Regular question
-                print(f"❓ {question['question']}")
-                
-                # Show options for choice questions
-                if question["type"] in ["single_choice", "multiple_choice"]:
-                    print("Options:")
-                    for i, option in enumerate(question["options"], 1):
-                        print(f"  {i}. {option}")
-                    if question.get("other_specify"):
-                        print("  (You can also specify 'Other' with details)")
-                    if question["type"] == "multiple_choice":
-                        print("  (You can select multiple options separated by commas)")
-                
-                # Show format hints for other question types
-                elif question["type"] == "date":
-                    print("(Format: YYYY-MM-DD, e.g., 2025-06-12)")
-                elif question["type"] == "time":
-                    print("(Format: HH:MM, e.g., 14:35)")
-                elif question["type"] == "number":
-                    print("(Please enter a number)")
-                elif question["type"] == "boolean":
-                    print("(Please answer: yes/no, true/false, or 1/0)")
+            lines.append(self._get_prompt((question["id"], None, None), self._render_question_prompt, question))
         
         # Show navigation hint if there are completed questions
         if state.get("questions_completed") and len(state["questions_completed"]) > 0:
-            print(f"\n💡 To change a previous answer, type 'change reply'")
+            lines.append(f"\n💡 To change a previous answer, type 'change reply'")
+        
+        self._write("\n".join(lines) + "\n")
+        return {}
+    
+    def _precompute_prompts(self):
+        """Render the static text prompt of every question, field and follow-up."""
+        for question in self.questions:
+            self._get_prompt((question["id"], None, None), self._render_question_prompt, question)
+            if question["type"] == "group":
+                for field in question["fields"]:
+                    self._get_prompt((question["id"], field["id"], None), self._render_field_prompt, field)
+            elif question["type"] == "repeat_group":
+                for field in question["fields"]:
+                    self._get_prompt((question["id"], field["id"], "repeat"),
+                                     self._render_repeat_field_hints, field)
+            
+            if "followup_if_yes" in question:
+                followup = self.get_followup_question_by_id(question["followup_if_yes"]["id"])
+                self._get_prompt((followup["id"], None, None), self._render_question_prompt, followup)
+    
+    def _get_prompt(self, key: Tuple, render, question_def: Dict[str, Any]) -> str:
+        """Return the cached text prompt for a question/field, rendering it on first use."""
+        prompt = self._prompts.get(key)
+        if prompt is None:
+            prompt = self._prompts[key] = "\n".join(render(question_def))
+        return prompt
+    
+    @staticmethod
+    def _option_lines(question_def: Dict[str, Any]) -> List[str]:
+        """Numbered options plus the other/multiple hints of a choice question."""
+        lines = ["Options:"]
+        lines.extend(f"  {_num(i)}. {option}" for i, option in enumerate(question_def["options"], 1))
+        if question_def.get("other_specify"):
+            lines.append("  (You can also specify 'Other' with details)")
+        if question_def["type"] == "multiple_choice":
+            lines.append("  (You can select multiple options separated by commas)")
+        return lines
+    
+    def _render_field_prompt(self, field: Dict[str, Any]) -> List[str]:
+        """Prompt lines of a group sub-question."""
+        lines = [f"❓ {field['question']}"]
+        if field["type"] in _CHOICE_TYPES:
+            lines.extend(self._option_lines(field))
+        return lines
+    
+    def _render_repeat_field_hints(self, field: Dict[str, Any]) -> List[str]:
+        """Format hints and options shown under a repeat group sub-question."""
+        lines = []
+        if field["type"] == "text":
+            if "type, make, and model" in field['question'].lower():
+                lines.append("   (Example: 'Sedan / Toyota / Camry' or 'SUV / Honda / CR-V')")
+            elif "licence plate" in field['question'].lower():
+                lines.append("   (Example: 'ABC-1234' or 'XYZ-5678')")
+            elif "damage" in field['question'].lower():
+                lines.append("   (Example: 'Front-left fender dented' or 'Rear bumper scratched')")
+        elif field["type"] == "number":
+            if "speed" in field['question'].lower():
+                lines.append("   (Example: 30, 45, 60 - just the number in km/h)")
+        
+        # Show options for choice questions
+        if field["type"] in _CHOICE_TYPES:
+            lines.extend(self._option_lines(field))
+        return lines
+    
+    def _render_question_prompt(self, question: Dict[str, Any]) -> List[str]:
+        """Prompt lines of a regular question or the start of a group/repeat_group question."""
+        lines = [f"❓ {question['question']}"]
+        
+        # For repeat_group questions, show special instructions
+        if question["type"] == "repeat_group":
+            lines.append("💡 I'll ask you about each vehicle separately, one question at a time.")
+            lines.append("📝 Let's start with Vehicle 1:")
+            # Start with the first field of the first instance
+            first_field = question["fields"][0]
+            lines.append(f"\n❓ Vehicle 1 - {first_field['question']}")
+            lines.append("   (Please provide details for just this one vehicle)")
+            
+            if first_field["type"] in _CHOICE_TYPES:
+                lines.extend(self._option_lines(first_field))
+            elif first_field["type"] in _FIRST_FIELD_HINT:
+                lines.append(_FIRST_FIELD_HINT[first_field["type"]])
         
-        return state
+        # Group questions start with their first field
+        elif question["type"] == "group":
+            lines.append("💡 I'll ask you each part of this question step by step.")
+            first_field = question["fields"][0]
+            lines.append(f"\n❓ {first_field['question']}")
+            if first_field["type"] in _CHOICE_TYPES:
+                lines.extend(self._option_lines(first_field))
+        
+        # Show options or format hints for regular questions
+        elif question["type"] in _CHOICE_TYPES:
+            lines.extend(self._option_lines(question))
+        elif question["type"] in _TYPE_HINT:
+            lines.append(_TYPE_HINT[question["type"]])
+        return lines
     
     def get_user_input(self, state: FormState) -> FormState:
-        """Get input from the user."""
-        if not self.interactive:
-            # Should never be reached, but guard anyway
-            raise RuntimeError("get_user_input called in non-interactive mode")
+        """Get input from the user.
         
-        user_response = input("\n👤 Your answer: ").strip()
+        In web mode the graph is suspended here and resumed by the web layer
+        with ``Command(resume=user_text)``.
+        """
+        if self.interactive:
+            user_response = input("\n👤 Your answer: ").strip()
+        else:
+            user_response = interrupt({"question_id": state["current_question_id"]})
         
-        return {
-            "messages": state["messages"] + [HumanMessage(content=user_response)]
-        }
+        # add_messages appends it to the existing history
+        return {"messages": [HumanMessage(content=user_response)]}
     
     def advance_to_next(self, state: FormState) -> FormState:
         """Advance to the next question."""
         next_question = self.get_next_question(state["current_question_index"])
         if next_question:
-            # Create a complete new state update without conflicting keys
             return {
-                **{k: v for k, v in state.items() if k not in [
-                    "current_question_id", "current_question_index", "current_group_question",
-                    "current_group_field_index", "group_data", "current_repeat_group_question",
-                    "current_repeat_instance", "current_repeat_field_index", "repeat_group_data",
-                    "current_instance_data", "retry_count", "last_error", "validation_success"
-                ]},
                 "current_question_id": next_question["id"],
                 "current_question_index": state["current_question_index"] + 1,
                 "current_group_question": None,
@@ -702,25 +880,23 @@ class FormWorkflow:
                 "current_repeat_field_index": 0,
                 "repeat_group_data": [],
                 "current_instance_data": {},
+                "current_repeat_expected": 0,
                 "retry_count": 0,
                 "last_error": None,
                 "validation_success": False
             }
-        return state
+        return {}
     
     def validate_input(self, state: FormState) -> FormState:
         """Validate the user's input against the question definition."""
         if not state["messages"]:
-            return state
+            return {}
             
         last_message = state["messages"][-1]
         original_user_input = last_message.content
         
-        # Parse UI response if web UI is enabled
-        # Parse UI responses (navigation edits are disabled)
-        user_input = original_user_input
-        if state.get("web_ui_enabled", False):
-            user_input, _ = parse_ui_response(original_user_input)  # edited_question_id is always None now
+        # Parse UI responses (navigation edits are disabled, so edited_question_id is always None)
+        user_input = self._parse_ui(original_user_input)[0]
         
         # Continue with normal validation (no navigation edit handling)
         return self._validate_current_question(state, user_input)
@@ -746,7 +922,6 @@ class FormWorkflow:
             if strategy == "continue":
                 # Simple edit - just update and continue
                 return {
-                    **state,
                     "form_data": new_form_data,
                     "last_error": None,
                     "retry_count": 0,
@@ -762,18 +937,13 @@ class FormWorkflow:
                     new_form_data.pop(clear_id, None)
                 
                 # Find the index of the restart question
-                restart_index = None
-                for i, q in enumerate(self.questions):
-                    if q["id"] == restart_question_id:
-                        restart_index = i
-                        break
+                restart_index = self._index_of(restart_question_id)
                 
                 if restart_index is not None:
                     # Reset to the restart question
-                    new_completed = [q for q in state["questions_completed"] if q != restart_question_id]
+                    new_completed = {q: order for q, order in state["questions_completed"].items() if q != restart_question_id}
                     
                     return {
-                        **state,
                         "form_data": new_form_data,
                         "current_question_id": restart_question_id,
                         "current_question_index": restart_index,
@@ -795,7 +965,6 @@ class FormWorkflow:
             
             # Default: continue normally
             return {
-                **state,
                 "form_data": new_form_data,
                 "last_error": None,
                 "retry_count": 0,
@@ -804,7 +973,7 @@ class FormWorkflow:
             
         except Exception as e:
             # If navigation analysis fails, just continue normally
-            print(f"Navigation analysis failed: {e}")
+            self._write(f"Navigation analysis failed: {e}\n")
             return self._validate_current_question(state, new_value)
     
     def _validate_current_question(self, state: FormState, user_input: str) -> FormState:
@@ -826,16 +995,12 @@ class FormWorkflow:
                 
                 if is_valid:
                     if not state.get("web_ui_enabled", False):
-                        print(f"✅ Answer recorded: {result}")
+                        self._write(f"✅ Answer recorded: {result}\n")
                     
                     # Store the field answer in current_instance_data
-                    new_instance_data = state.get("current_instance_data", {}).copy()
-                    new_instance_data[current_field["id"]] = result
+                    new_instance_data = {**state.get("current_instance_data", {}), current_field["id"]: result}
                     
                     return {
-                        **{k: v for k, v in state.items() if k not in [
-                            "current_instance_data", "retry_count", "last_error", "validation_success"
-                        ]},
                         "current_instance_data": new_instance_data,
                         "retry_count": 0,
                         "last_error": None,
@@ -844,9 +1009,6 @@ class FormWorkflow:
                 else:
                     error_msg = f"Invalid input: {result}. Please try again."
                     return {
-                        **{k: v for k, v in state.items() if k not in [
-                            "retry_count", "last_error", "validation_success"
-                        ]},
                         "retry_count": state["retry_count"] + 1,
                         "last_error": error_msg,
                         "validation_success": False
@@ -855,7 +1017,6 @@ class FormWorkflow:
         # For now, return a simple validation success for other cases
         # TODO: Implement full validation logic for groups and regular questions
         return {
-            **state,
             "retry_count": 0,
             "last_error": None,
             "validation_success": True
@@ -863,84 +1024,39 @@ class FormWorkflow:
 
     def handle_followup(self, state: FormState) -> FormState:
         """Handle conditional followup questions."""
-        current_question = self.get_question_by_id(state["current_question_id"])
-        if not current_question:
-            return state
-            
-        # Check if current question has followup logic
-        if current_question["type"] == "boolean":
-            user_answer = state["form_data"].get(state["current_question_id"])
+        question_id = state["current_question_id"]
+        info = self._route_info.get(question_id)
+        if info is None:
+            return {}
             
-            # Handle followup_if_yes
-            if user_answer is True and "followup_if_yes" in current_question:
-                followup = current_question["followup_if_yes"]
-                print(f"\n🔄 Follow-up question needed...")
-                
-                # Store the follow-up question in form_data and mark as completed
-                new_form_data = state["form_data"].copy()
-                new_completed = state["questions_completed"].copy()
-                
-                # For now, we'll handle table type follow-ups by asking for a simple text description
-                # since the current validator doesn't support table questions in a user-friendly way
-                if followup["type"] == "table":
-                    # Convert table question to a simple text question for now
-                    simplified_question = {
-                        "id": followup["id"],
-                        "question": followup["question"] + "\n(Please provide details separated by commas or semicolons)",
-                        "type": "multiline_text"
-                    }
-                    
-                    # Create a complete new state update without conflicting keys
-                    return {
-                        **{k: v for k, v in state.items() if k not in [
-                            "current_question_id", "retry_count", "last_error", "validation_success"
-                        ]},
-                        "current_question_id": followup["id"],
-                        "retry_count": 0,
-                        "last_error": None,
-                        "validation_success": False  # Reset for followup question
-                    }
-                else:
-                    # Regular follow-up question
-                    return {
-                        **{k: v for k, v in state.items() if k not in [
-                            "current_question_id", "retry_count", "last_error", "validation_success"
-                        ]},
-                        "current_question_id": followup["id"],
-                        "retry_count": 0,
-                        "last_error": None,
-                        "validation_success": False  # Reset for followup question
-                    }
+        # Boolean questions with followup_if_yes ask it after a "yes".
+        # Table follow-ups are asked as multiline text (see _materialize_followup).
+        if info.followup_id is not None and state["form_data"].get(question_id) is True:
+            self._write(f"\n🔄 Follow-up question needed...\n")
+            return {
+                "current_question_id": info.followup_id,
+                "retry_count": 0,
+                "last_error": None,
+                "validation_success": False  # Reset for followup question
+            }
         
-        return state
+        return {}
         
     def get_followup_question_by_id(self, question_id: str) -> Optional[Dict[str, Any]]:
         """Get a follow-up question definition by ID."""
-        for main_question in self.questions:
-            if "followup_if_yes" in main_question and main_question["followup_if_yes"]["id"] == question_id:
-                followup = main_question["followup_if_yes"].copy()
-                # Convert table questions to multiline_text for user-friendliness
-                if followup["type"] == "table":
-                    followup["type"] = "multiline_text"
-                    followup["question"] = followup["question"] + "\n(Please provide details separated by commas or semicolons)"
-                return followup
-        return None
+        return self._followup_by_id.get(question_id)
     
     def handle_group_question(self, state: FormState) -> FormState:
         """Handle progression through group question fields."""
-        if not state.get("current_group_question"):
-            return state
+        group_question = state.get("current_group_question")
+        if not group_question:
+            return {}
         
-        group_question = state["current_group_question"]
         current_field_index = state.get("current_group_field_index", 0)
         
         # Move to next field in the group
         if current_field_index + 1 < len(group_question["fields"]):
-            # Create a complete new state update without conflicting keys
             return {
-                **{k: v for k, v in state.items() if k not in [
-                    "current_group_field_index", "retry_count", "last_error", "validation_success"
-                ]},
                 "current_group_field_index": current_field_index + 1,
                 "retry_count": 0,  # Reset retry count for new field
                 "last_error": None,  # Clear any previous errors
@@ -949,21 +1065,12 @@ class FormWorkflow:
         else:
             # We've completed all fields in the group
             # Store the complete group data
-            new_form_data = state["form_data"].copy()
-            new_form_data[state["current_question_id"]] = state["group_data"]
-            
-            new_completed = state["questions_completed"].copy()
-            if state["current_question_id"] not in new_completed:
-                new_completed.append(state["current_question_id"])
+            question_id = state["current_question_id"]
+            new_form_data = {**state["form_data"], question_id: state["group_data"]}
+            new_completed = _mark_completed(state["questions_completed"], question_id)
             
-            print(f"✅ Group question completed: {state['group_data']}")
-            
-            # Create a complete new state update without conflicting keys
+            self._write(f"✅ Group question completed: {state['group_data']}\n")
             return {
-                **{k: v for k, v in state.items() if k not in [
-                    "form_data", "questions_completed", "current_group_question",
-                    "current_group_field_index", "group_data", "retry_count", "last_error", "validation_success"
-                ]},
                 "form_data": new_form_data,
                 "questions_completed": new_completed,
                 "current_group_question": None,
@@ -976,10 +1083,10 @@ class FormWorkflow:
     
     def handle_repeat_group(self, state: FormState) -> FormState:
         """Handle progression through repeat group question fields and instances."""
-        if not state.get("current_repeat_group_question"):
-            return state
+        repeat_group = state.get("current_repeat_group_question")
+        if not repeat_group:
+            return {}
         
-        repeat_group = state["current_repeat_group_question"]
         current_instance = state.get("current_repeat_instance", 0)
         current_field_index = state.get("current_repeat_field_index", 0)
         
@@ -987,9 +1094,6 @@ class FormWorkflow:
         if current_field_index + 1 < len(repeat_group["fields"]):
             # Move to next field in the current instance
             return {
-                **{k: v for k, v in state.items() if k not in [
-                    "current_repeat_field_index", "retry_count", "last_error", "validation_success"
-                ]},
                 "current_repeat_field_index": current_field_index + 1,
                 "retry_count": 0,
                 "last_error": None,
@@ -998,44 +1102,31 @@ class FormWorkflow:
         else:
             # We've completed all fields for this instance
             # Add current instance data to the repeat group data
-            new_repeat_group_data = state.get("repeat_group_data", []).copy()
-            new_repeat_group_data.append(state.get("current_instance_data", {}))
+            instance_data = state.get("current_instance_data", {})
+            new_repeat_group_data = [*state.get("repeat_group_data", []), instance_data]
             
-            print(f"✅ Vehicle {current_instance + 1} details completed!")
-            print(f"   📝 {state.get('current_instance_data', {})}")
+            self._write(f"✅ Vehicle {current_instance + 1} details completed!\n   📝 {instance_data}\n")
             
             # Check if we should ask for more or finish
             # For now, let's assume they want to add exactly as many as specified in the number_of_vehicles question
             # But we'll also ask if they want to add more
             
-            # For vehicle questions, we need to check how many vehicles they said were involved
-            num_vehicles_answer = state["form_data"].get("number_of_vehicles_involved")
-            expected_vehicles = 2  # Default
-            
-            if isinstance(num_vehicles_answer, dict) and "choice" in num_vehicles_answer:
-                if num_vehicles_answer["choice"] in ["1", "2", "3"]:
-                    expected_vehicles = int(num_vehicles_answer["choice"])
-                else:
-                    expected_vehicles = 2  # Default for "Other"
-            elif isinstance(num_vehicles_answer, str):
-                if num_vehicles_answer in ["1", "2", "3"]:
-                    expected_vehicles = int(num_vehicles_answer)
+            # For vehicle questions, we need to check how many vehicles they said were involved.
+            # The answer can't change mid-group, so it's read once when the first vehicle completes.
+            expected_vehicles = state.get("current_repeat_expected") or _count_from_answer(
+                state["form_data"].get("number_of_vehicles_involved"))
             
             completed_vehicles = len(new_repeat_group_data)
             
             if completed_vehicles < expected_vehicles:
                 # Start next vehicle
-                print(f"\n� Great! Now let's get details for Vehicle {completed_vehicles + 1} of {expected_vehicles}...")
-                print(f"─" * 50)
+                self._write(f"\n� Great! Now let's get details for Vehicle {completed_vehicles + 1} of {expected_vehicles}...\n{_SEP_BOX}\n")
                 
                 return {
-                    **{k: v for k, v in state.items() if k not in [
-                        "repeat_group_data", "current_instance_data", "current_repeat_instance",
-                        "current_repeat_field_index", "retry_count", "last_error", "validation_success"
-                    ]},
                     "repeat_group_data": new_repeat_group_data,
                     "current_instance_data": {},
                     "current_repeat_instance": current_instance + 1,
+                    "current_repeat_expected": expected_vehicles,
                     "current_repeat_field_index": 0,
                     "retry_count": 0,
                     "last_error": None,
@@ -1043,21 +1134,13 @@ class FormWorkflow:
                 }
             else:
                 # We've completed all expected vehicles - finish the repeat group
-                new_form_data = state["form_data"].copy()
-                new_form_data[state["current_question_id"]] = new_repeat_group_data
-                
-                new_completed = state["questions_completed"].copy()
-                if state["current_question_id"] not in new_completed:
-                    new_completed.append(state["current_question_id"])
+                question_id = state["current_question_id"]
+                new_form_data = {**state["form_data"], question_id: new_repeat_group_data}
+                new_completed = _mark_completed(state["questions_completed"], question_id)
                 
-                print(f"✅ All vehicles completed! ({completed_vehicles} vehicles)")
+                self._write(f"✅ All vehicles completed! ({completed_vehicles} vehicles)\n")
                 
                 return {
-                    **{k: v for k, v in state.items() if k not in [
-                        "form_data", "questions_completed", "current_repeat_group_question",
-                        "current_repeat_instance", "current_repeat_field_index", "repeat_group_data",
-                        "current_instance_data", "retry_count", "last_error", "validation_success"
-                    ]},
                     "form_data": new_form_data,
                     "questions_completed": new_completed,
                     "current_repeat_group_question": None,
@@ -1065,6 +1148,7 @@ class FormWorkflow:
                     "current_repeat_field_index": 0,
                     "repeat_group_data": [],
                     "current_instance_data": {},
+                    "current_repeat_expected": 0,
                     "retry_count": 0,
                     "last_error": None,
                     "validation_success": True
@@ -1072,34 +1156,37 @@ class FormWorkflow:
     
     def complete_form(self, state: FormState) -> FormState:
         """Complete the form and show summary."""
-        print("\n🎉 Form completed successfully!")
-        print("=" * 60)
-        print("\n📋 Form Summary:")
-        print("-" * 30)
-        
-        for question_id, answer in state["form_data"].items():
-            question = self.get_question_by_id(question_id)
-            if question:
-                print(f"\n{question['question']}")
-                if isinstance(answer, dict):
-                    for key, value in answer.items():
-                        print(f"  {key}: {value}")
-                elif isinstance(answer, list):
-                    for i, item in enumerate(answer, 1):
-                        print(f"  {i}. {item}")
-                else:
-                    print(f"  Answer: {answer}")
+        # The summary is console-only, so web UI sessions skip building it
+        if self._console:
+            buf = io.StringIO()
+            w = buf.write
+            w(f"\n🎉 Form completed successfully!\n{_SEP_EQ}\n\n📋 Form Summary:\n{_SEP_DASH}\n")
+            for question_id, answer in state["form_data"].items():
+                question = self.get_question_by_id(question_id)
+                if question:
+                    w(f"\n{question['question']}\n")
+                    answer_text = _format_answer(answer)
+                    if answer_text:
+                        w(answer_text)
+                        w("\n")
+            self._write(buf.getvalue())
         
         # Save to file
         output_file = "completed_form.json"
-        with open(output_file, 'w') as f:
-            json.dump({
-                "form_title": self.questions_data["title"],
-                "completion_date": "2025-08-06",  # Could use datetime.now()
-                "responses": state["form_data"]
-            }, f, indent=2, default=str)
+        payload = {
+            "form_title": self.questions_data["title"],
+            "completion_date": "2025-08-06",  # Could use datetime.now()
+            "responses": state["form_data"]
+        }
+        # Serialize in one go and write once rather than streaming many small writes
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(payload, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_file, 'w') as f:
+                f.write(json.dumps(payload, indent=2, default=str))
         
-        print(f"\n💾 Form data saved to: {output_file}")
+        self._write(f"\n💾 Form data saved to: {output_file}\n")
         
         return {"form_complete": True}
     
@@ -1110,9 +1197,9 @@ class FormWorkflow:
             return "retry"
         
         # Check if we're in a repeat_group question and need to continue with more fields or instances
-        if state.get("current_repeat_group_question"):
+        repeat_group = self._has_repeat and state.get("current_repeat_group_question")
+        if repeat_group:
             current_field_index = state.get("current_repeat_field_index", 0)
-            repeat_group = state["current_repeat_group_question"]
             
             if current_field_index + 1 < len(repeat_group["fields"]):
                 # More fields to go in this instance
@@ -1122,9 +1209,9 @@ class FormWorkflow:
                 return "repeat_group_complete"
         
         # Check if we're in a group question and need to continue with more fields
-        if state.get("current_group_question"):
+        group_question = self._has_group and state.get("current_group_question")
+        if group_question:
             current_field_index = state.get("current_group_field_index", 0)
-            group_question = state["current_group_question"]
             
             if current_field_index + 1 < len(group_question["fields"]):
                 # More fields to go in this group
@@ -1133,24 +1220,27 @@ class FormWorkflow:
                 # Group is complete, need to finalize it
                 return "group_complete"
         
-        current_question = self.get_question_by_id(state["current_question_id"])
-        if not current_question:
+        question_id = state["current_question_id"]
+        info = self._route_info.get(question_id)
+        if info is None:
             return "complete"
         
         # Check if we need a followup
-        if current_question["type"] == "boolean":
-            user_answer = state["form_data"].get(state["current_question_id"])
-            if user_answer is True and "followup_if_yes" in current_question:
-                return "followup"
+        if info.followup_id is not None and state["form_data"].get(question_id) is True:
+            return "followup"
         
         # Check if this is the last question
-        if state["current_question_index"] >= len(self.questions) - 1:
+        if state["current_question_index"] >= self._last_q_index:
             return "complete"
         
         return "next_question"
     
-    def route_after_followup(self, state: FormState) -> Literal["next_question", "complete"]:
+    def route_after_followup(self, state: FormState) -> Literal["ask_followup", "next_question", "complete"]:
         """Route after handling followup questions."""
+        # handle_followup switched to a follow-up question that still needs an answer
+        if state["current_question_id"] != self._qids[state["current_question_index"]]:
+            return "ask_followup"
+        
         # Check if there are more main questions
         next_question = self.get_next_question(state["current_question_index"])
         if next_question:
@@ -1162,7 +1252,7 @@ class FormWorkflow:
         # If there's no current group question, we've completed it
         if not state.get("current_group_question"):
             # Check if this is the last question
-            if state["current_question_index"] >= len(self.questions) - 1:
+            if state["current_question_index"] >= self._last_q_index:
                 return "complete"
             return "next_question"
         else:
@@ -1176,7 +1266,7 @@ class FormWorkflow:
             return "continue_repeat"
         
         # If we're done with the repeat group, move to next question
-        if state["current_question_index"] >= len(self.questions) - 1:
+        if state["current_question_index"] >= self._last_q_index:
             return "complete"
         
         return "next_question"
@@ -7,6 +7,46 @@ the appropriate navigation strategy based on question types and dependencies.
 
 from typing import Dict, Any, List, Optional, Tuple, Set
 import json
+import re
+
+
+# Template for analyze_edit_impact results; strategies are
+# continue, restart_branch, restart_from_edit and confirm_and_restart
+_DEFAULT_RESULT: Dict[str, Any] = {
+    "strategy": "continue",
+    "reason": "",
+    "affected_questions": [],
+    "requires_confirmation": False,
+    "confirmation_message": "",
+    "restart_from_question_id": None,
+    "data_to_clear": []
+}
+
+# Maximum number of cached edit analyses per analyzer before the cache is reset
+_IMPACT_CACHE_SIZE = 512
+
+
+def _cache_key(value: Any) -> Optional[Tuple]:
+    """Return a hashable key for an answer value, or None if it can't be cached."""
+    # The type is part of the key because equal values like 1, 1.0 and True extract differently
+    key = (list, tuple(value)) if isinstance(value, list) else (type(value), value)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+# String answers treated as "yes" when comparing branch values (same spellings the validator accepts)
+_TRUTHY = frozenset({'yes', 'y', 'true', 't', '1'})
+
+# Count extraction helpers for answers like "2", "Two" or "2 vehicles"
+_DIGIT_RE = re.compile(r'\d+')
+_WORD_RE = re.compile(r'[a-z]+')
+_WORD_TO_NUM = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10
+}
 
 
 class NavigationImpactAnalyzer:
@@ -17,32 +57,73 @@ class NavigationImpactAnalyzer:
         self.questions_data = questions_data
         self.questions = questions_data.get("questions", [])
         self._build_dependency_map()
+        # Results of dependency-affecting edits keyed by (question_id, new_value, old_value)
+        self._impact_cache: Dict[Tuple, Dict[str, Any]] = {}
     
     def _build_dependency_map(self):
         """Build a map of question dependencies and impacts."""
         self.branching_questions = set()
         self.repeat_group_triggers = set()
         self.question_dependencies = {}
+        # Branching question ID -> its followup question ID
+        self.followup_ids: Dict[str, str] = {}
+        # Lookup indexes so edit analysis doesn't rescan the questionnaire
+        self.question_by_id: Dict[str, Dict[str, Any]] = {}
+        self.repeat_group_field_ids: Set[str] = set()
+        self._repeat_group_field_ids_by_parent: Dict[str, Set[str]] = {}
+        self._repeat_groups: List[Dict[str, Any]] = []
+        # Questions whose ID suggests they control how many repeat-group items are needed
+        self._count_trigger_ids: Set[str] = set()
+        last_count_trigger_id = None
         
         for question in self.questions:
             q_id = question["id"]
+            q_type = question["type"]
+            
+            # Index the question, its group/repeat_group fields and its followup (first definition wins)
+            self.question_by_id.setdefault(q_id, question)
+            if q_type == "repeat_group":
+                # Identify repeat group triggers
+                self.repeat_group_triggers.add(q_id)
+                self._repeat_groups.append(question)
+                field_ids = self._repeat_group_field_ids_by_parent.setdefault(q_id, set())
+                for field in question.get("fields", []):
+                    self.question_by_id.setdefault(field["id"], field)
+                    field_ids.add(field["id"])
+                self.repeat_group_field_ids |= field_ids
+            elif q_type == "group":
+                for field in question.get("fields", []):
+                    self.question_by_id.setdefault(field["id"], field)
             
             # Identify branching questions (have followup_if_yes)
-            if question.get("followup_if_yes"):
+            followup = question.get("followup_if_yes")
+            if followup:
+                self.question_by_id.setdefault(followup["id"], followup)
                 self.branching_questions.add(q_id)
-                followup_id = question["followup_if_yes"]["id"]
-                self.question_dependencies[followup_id] = q_id
-            
-            # Identify repeat group triggers
-            if question["type"] == "repeat_group":
-                self.repeat_group_triggers.add(q_id)
+                self.question_dependencies[followup["id"]] = q_id
+                self.followup_ids[q_id] = followup["id"]
             
             # Check for questions that might affect repeat group counts
-            if "number" in q_id.lower() and ("vehicle" in q_id.lower() or "participant" in q_id.lower()):
+            q_id_lower = q_id.lower()
+            if "number" in q_id_lower and ("vehicle" in q_id_lower or "participant" in q_id_lower):
                 # This is likely a question that affects how many instances we need
-                for other_q in self.questions:
-                    if other_q["type"] == "repeat_group":
-                        self.question_dependencies[other_q["id"]] = q_id
+                self._count_trigger_ids.add(q_id)
+                last_count_trigger_id = q_id
+        
+        # Wire every repeat group to the count trigger (the last trigger in question order wins)
+        if last_count_trigger_id is not None:
+            for repeat_group in self._repeat_groups:
+                self.question_dependencies[repeat_group["id"]] = last_count_trigger_id
+        
+        # Invert the map: trigger question -> repeat groups whose count it controls
+        self.affected_repeats: Dict[str, List[str]] = {}
+        for repeat_group in self._repeat_groups:
+            trigger_id = self.question_dependencies.get(repeat_group["id"])
+            if trigger_id is not None:
+                self.affected_repeats.setdefault(trigger_id, []).append(repeat_group["id"])
+        
+        # Edits to any other question can take the simple "continue" path
+        self._impactful_ids = self.branching_questions | self._count_trigger_ids | self.repeat_group_field_ids
     
     def analyze_edit_impact(self, edited_question_id: str, new_value: Any, 
                           current_state: Dict[str, Any]) -> Dict[str, Any]:
@@ -57,39 +138,55 @@ class NavigationImpactAnalyzer:
         Returns:
             Dict containing navigation strategy and impact analysis
         """
-        result = {
-            "strategy": "continue",  # continue, restart_branch, restart_from_edit, confirm_and_restart
-            "reason": "",
-            "affected_questions": [],
-            "requires_confirmation": False,
-            "confirmation_message": "",
-            "restart_from_question_id": None,
-            "data_to_clear": []
-        }
+        # Fast path: most edits can't change branching or repeat-group counts
+        if edited_question_id not in self._impactful_ids:
+            if edited_question_id not in self.question_by_id:
+                return self._new_result("Question not found, continuing normally")
+            return self._new_result(
+                f"Simple question edit for '{edited_question_id}' - no dependencies affected"
+            )
         
-        # Get the edited question definition
-        edited_question = self._get_question_by_id(edited_question_id)
-        if not edited_question:
-            result["strategy"] = "continue"
-            result["reason"] = "Question not found, continuing normally"
-            return result
+        form_data = current_state.get("form_data") or {}
+        
+        # The analysis only depends on the question and its old and new values
+        new_key = _cache_key(new_value)
+        old_key = _cache_key(form_data.get(edited_question_id))
+        if new_key is None or old_key is None:
+            return self._classify_edit(edited_question_id, new_value, form_data, current_state)
+        
+        key = (edited_question_id, new_key, old_key)
+        result = self._impact_cache.get(key)
+        if result is None:
+            if len(self._impact_cache) >= _IMPACT_CACHE_SIZE:
+                self._impact_cache.clear()
+            result = self._impact_cache[key] = self._classify_edit(
+                edited_question_id, new_value, form_data, current_state
+            )
+        # Callers get their own lists so they can't alter the cached result
+        return {**result, "affected_questions": list(result["affected_questions"]),
+                "data_to_clear": list(result["data_to_clear"])}
+    
+    def _classify_edit(self, edited_question_id: str, new_value: Any, form_data: Dict[str, Any],
+                       current_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the branching, repeat-count and repeat-field analyses for an impactful edit."""
+        result = self._new_result("")
         
         # Check if this is a branching question
         if edited_question_id in self.branching_questions:
             return self._analyze_branching_question_edit(
-                edited_question_id, new_value, current_state, result
+                edited_question_id, new_value, form_data, result
             )
         
         # Check if this affects repeat group counts
         if self._affects_repeat_group_count(edited_question_id, new_value, current_state):
             return self._analyze_repeat_group_count_edit(
-                edited_question_id, new_value, current_state, result
+                edited_question_id, new_value, form_data, result
             )
         
         # Check if this is editing within a repeat group
         if self._is_repeat_group_field_edit(edited_question_id, current_state):
             return self._analyze_repeat_group_field_edit(
-                edited_question_id, new_value, current_state, result
+                edited_question_id, new_value, form_data, result
             )
         
         # Default: simple question edit
@@ -97,24 +194,30 @@ class NavigationImpactAnalyzer:
         result["reason"] = f"Simple question edit for '{edited_question_id}' - no dependencies affected"
         return result
     
+    def _new_result(self, reason: str) -> Dict[str, Any]:
+        """Create a "continue" result for the given reason."""
+        # Fresh lists so callers can mutate the result without touching the template
+        return {**_DEFAULT_RESULT, "reason": reason, "affected_questions": [], "data_to_clear": []}
+    
     def _analyze_branching_question_edit(self, question_id: str, new_value: Any, 
-                                       current_state: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+                                       form_data: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze edit impact for branching questions."""
-        old_value = current_state.get("form_data", {}).get(question_id)
+        old_value = form_data.get(question_id)
         
-        # Convert values to boolean for comparison
-        old_bool = self._to_boolean(old_value)
-        new_bool = self._to_boolean(new_value)
+        # Identical answers can't switch branches, so only convert values that differ
+        branch_changed = False
+        if old_value != new_value:
+            new_bool = self._to_boolean(new_value)
+            branch_changed = self._to_boolean(old_value) != new_bool
         
-        if old_bool == new_bool:
+        if not branch_changed:
             # Same branch, just update and continue
             result["strategy"] = "continue"
             result["reason"] = f"Branch unchanged for '{question_id}' - continuing from current position"
             return result
         
         # Branch changed - need to restart from this question
-        question_def = self._get_question_by_id(question_id)
-        followup_id = question_def.get("followup_if_yes", {}).get("id")
+        followup_id = self.followup_ids.get(question_id)
         
         if new_bool and followup_id:
             # Changed to Yes - will now have followup
@@ -133,9 +236,9 @@ class NavigationImpactAnalyzer:
         return result
     
     def _analyze_repeat_group_count_edit(self, question_id: str, new_value: Any, 
-                                       current_state: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+                                       form_data: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze edit impact when changing repeat group counts."""
-        old_count = self._extract_count_from_value(current_state.get("form_data", {}).get(question_id))
+        old_count = self._extract_count_from_value(form_data.get(question_id))
         new_count = self._extract_count_from_value(new_value)
         
         if old_count == new_count:
@@ -144,10 +247,7 @@ class NavigationImpactAnalyzer:
             return result
         
         # Find affected repeat groups
-        affected_repeat_groups = []
-        for q in self.questions:
-            if q["type"] == "repeat_group" and self.question_dependencies.get(q["id"]) == question_id:
-                affected_repeat_groups.append(q["id"])
+        affected_repeat_groups = list(self.affected_repeats.get(question_id, []))
         
         if not affected_repeat_groups:
             result["strategy"] = "continue"
@@ -175,7 +275,7 @@ class NavigationImpactAnalyzer:
         return result
     
     def _analyze_repeat_group_field_edit(self, question_id: str, new_value: Any, 
-                                       current_state: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+                                       form_data: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze edit impact for fields within repeat groups."""
         # For now, editing individual repeat group fields is safe - just update and continue
         result["strategy"] = "continue"
@@ -185,47 +285,26 @@ class NavigationImpactAnalyzer:
     def _affects_repeat_group_count(self, question_id: str, new_value: Any, current_state: Dict[str, Any]) -> bool:
         """Check if editing this question affects repeat group counts."""
         # Check if any repeat groups depend on this question
-        for q in self.questions:
-            if q["type"] == "repeat_group" and self.question_dependencies.get(q["id"]) == question_id:
-                return True
+        if self.affected_repeats.get(question_id):
+            return True
         
         # Also check based on question content
-        if "number" in question_id.lower() and ("vehicle" in question_id.lower() or "participant" in question_id.lower()):
-            return True
-            
-        return False
+        return question_id in self._count_trigger_ids
     
     def _is_repeat_group_field_edit(self, question_id: str, current_state: Dict[str, Any]) -> bool:
         """Check if this is editing a field within a repeat group."""
-        # Look through all repeat groups to see if this question_id is a field
-        for question in self.questions:
-            if question["type"] == "repeat_group":
-                for field in question.get("fields", []):
-                    if field["id"] == question_id:
-                        return True
-        return False
+        return question_id in self.repeat_group_field_ids
     
     def _get_question_by_id(self, question_id: str) -> Optional[Dict[str, Any]]:
-        """Get question definition by ID."""
-        for question in self.questions:
-            if question["id"] == question_id:
-                return question
-            # Also check within repeat groups and groups
-            if question["type"] in ["repeat_group", "group"]:
-                for field in question.get("fields", []):
-                    if field["id"] == question_id:
-                        return field
-            # Check followup questions
-            if question.get("followup_if_yes", {}).get("id") == question_id:
-                return question["followup_if_yes"]
-        return None
+        """Get question definition by ID (including group/repeat_group fields and followups)."""
+        return self.question_by_id.get(question_id)
     
     def _to_boolean(self, value: Any) -> bool:
         """Convert various value types to boolean."""
+        if isinstance(value, str):
+            return value.strip().lower() in _TRUTHY
         if isinstance(value, bool):
             return value
-        if isinstance(value, str):
-            return value.lower() in ['yes', 'true', '1', 'y']
         if isinstance(value, (int, float)):
             return bool(value)
         return False
@@ -236,21 +315,22 @@ class NavigationImpactAnalyzer:
             return value
         if isinstance(value, str):
             # Try to extract number from strings like "2", "Two", "2 vehicles"
-            import re
-            numbers = re.findall(r'\d+', str(value))
-            if numbers:
-                return int(numbers[0])
+            match = _DIGIT_RE.search(value)
+            if match:
+                return int(match.group())
             # Handle word numbers
-            word_to_num = {
-                'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-                'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10
-            }
-            for word, num in word_to_num.items():
-                if word in str(value).lower():
+            for word in _WORD_RE.findall(value.lower()):
+                num = _WORD_TO_NUM.get(word)
+                if num:
                     return num
         return 0
 
 
+# Analyzers keyed by id(questions_data) -> (questions_data, analyzer). Holding the
+# data keeps its id from being reused; the identity check guards against stale hits.
+_ANALYZER_CACHE: Dict[int, Tuple[Dict[str, Any], NavigationImpactAnalyzer]] = {}
+
+
 def get_navigation_strategy(questions_data: Dict[str, Any], edited_question_id: str, 
                           new_value: Any, current_state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -265,7 +345,12 @@ def get_navigation_strategy(questions_data: Dict[str, Any], edited_question_id:
     Returns:
         Navigation strategy dictionary
     """
-    analyzer = NavigationImpactAnalyzer(questions_data)
+    key = id(questions_data)
+    cached = _ANALYZER_CACHE.get(key)
+    if cached is None or cached[0] is not questions_data:
+        cached = (questions_data, NavigationImpactAnalyzer(questions_data))
+        _ANALYZER_CACHE[key] = cached
+    analyzer = cached[1]
     return analyzer.analyze_edit_impact(edited_question_id, new_value, current_state)
 
 
@@ -6,17 +6,25 @@ Tests the intelligent navigation when users edit previous answers
 
 import sys
 import os
+import json
 sys.path.append(os.path.dirname(__file__))
 
 from navigation_analyzer import NavigationImpactAnalyzer
-import json
+
+# Resolved relative to this file so the script works from any working directory
+QUESTIONS_FILE = os.path.join(os.path.dirname(__file__), '..', 'questionnaire', 'questions.json')
+
+
+def load_questions():
+    """Load the questionnaire the scenarios run against."""
+    with open(QUESTIONS_FILE, 'r') as f:
+        return json.load(f)
 
 def test_navigation_scenarios():
     """Test various navigation edit scenarios"""
     
     # Load questions for testing
-    with open('../questionnaire/questions.json', 'r') as f:
-        questions = json.load(f)
+    questions = load_questions()
     
     analyzer = NavigationImpactAnalyzer(questions)
     
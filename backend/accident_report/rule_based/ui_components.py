@@ -12,13 +12,49 @@ Features:
 - Compatible with web interface via JSON message format
 """
 
-from typing import Dict, Any, List, Optional, Union, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Union, Tuple
 import json
+try:
+    import orjson
+except ImportError:  # Optional: UI messages are (de)serialized with stdlib json instead
+    orjson = None
+
+# JSON decoder for UI replies; orjson.JSONDecodeError subclasses json.JSONDecodeError
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+# Fixed pieces of the question text
+_QUESTION_PREFIX = "❓ "
+_SINGLE_CHOICE_PROMPT = "\n\nYou can click one option below, or type your answer:\n\n"
+_MULTIPLE_CHOICE_PROMPT = "\n\nYou can click one or more options below, or type your answer:\n\n"
+_OTHER_NOTE = "\n💡 You can also specify 'Other' with custom details"
+_TEXT_PROMPT = "\n\nPlease type your answer below:"
+_PROGRESS_FMT = "📋 Question {}/{}\n" + "-" * 40 + "\n\n"
+_RETRY_SUFFIX = "\nLet me ask that again...\n\n"
+
+# "completed_questions" entries keyed by question ID. Every message shares the same
+# entry dicts, so they are only serialized, never mutated
+_COMPLETED_ENTRIES: Dict[str, Dict[str, Any]] = {}
+
+# Choice component instructions keyed by (allow_multiple, allow_other)
+_INSTRUCTIONS = {
+    (True, True): "Click one or more options below: (Select 'Other' and specify if needed)",
+    (True, False): "Click one or more options below:",
+    (False, True): "Click one option below: (Select 'Other' and specify if needed)",
+    (False, False): "Click one option below:",
+}
+
+
+# Text input (input_type, placeholder, hint) keyed by (question type, question text);
+# the config only depends on those two, so each distinct question is scanned once
+_TEXT_INPUT_CONFIG_CACHE: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
 
 
 class UIComponent:
     """Base class for UI components."""
     
+    __slots__ = ("type", "question_id", "question_text")
+    
     def __init__(self, component_type: str, question_id: str, question_text: str):
         self.type = component_type
         self.question_id = question_id
@@ -36,58 +72,51 @@ class UIComponent:
 class ClickableChoiceComponent(UIComponent):
     """Clickable component for single and multiple choice questions."""
     
+    __slots__ = ("options", "allow_multiple", "allow_other", "instructions")
+    
     def __init__(self, question_id: str, question_text: str, options: List[str], 
                  allow_multiple: bool = False, allow_other: bool = False):
-        component_type = "clickable_choice"
-        super().__init__(component_type, question_id, question_text)
+        super().__init__("clickable_choice", question_id, question_text)
         self.options = options
         self.allow_multiple = allow_multiple
         self.allow_other = allow_other
+        self.instructions = _INSTRUCTIONS[bool(allow_multiple), bool(allow_other)]
         
     def to_dict(self) -> Dict[str, Any]:
         """Convert component to dictionary for JSON serialization."""
-        base_dict = super().to_dict()
-        base_dict.update({
+        return {
+            "type": self.type,
+            "question_id": self.question_id,
+            "question_text": self.question_text,
             "options": self.options,
             "allow_multiple": self.allow_multiple,
             "allow_other": self.allow_other,
-            "instructions": self._get_instructions()
-        })
-        return base_dict
-    
-    def _get_instructions(self) -> str:
-        """Generate user instructions for the component."""
-        if self.allow_multiple:
-            base = "Click one or more options below:"
-            if self.allow_other:
-                base += " (Select 'Other' and specify if needed)"
-        else:
-            base = "Click one option below:"
-            if self.allow_other:
-                base += " (Select 'Other' and specify if needed)"
-        return base
+            "instructions": self.instructions
+        }
 
 
 class TextInputComponent(UIComponent):
     """Standard text input component for questions that don't support clicking."""
     
+    __slots__ = ("input_type", "placeholder", "hint")
+    
     def __init__(self, question_id: str, question_text: str, input_type: str = "text",
                  placeholder: str = "", hint: str = ""):
-        component_type = "text_input"
-        super().__init__(component_type, question_id, question_text)
+        super().__init__("text_input", question_id, question_text)
         self.input_type = input_type  # text, number, date, time, etc.
         self.placeholder = placeholder
         self.hint = hint
         
     def to_dict(self) -> Dict[str, Any]:
         """Convert component to dictionary for JSON serialization."""
-        base_dict = super().to_dict()
-        base_dict.update({
+        return {
+            "type": self.type,
+            "question_id": self.question_id,
+            "question_text": self.question_text,
             "input_type": self.input_type,
             "placeholder": self.placeholder,
             "hint": self.hint
-        })
-        return base_dict
+        }
 
 
 class UIComponentFactory:
@@ -139,11 +168,41 @@ class UIComponentFactory:
                 hint=hint
             )
     
+    @staticmethod
+    def build_dict(question_def: Dict[str, Any],
+                   current_field: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Build the serialized UI component directly, without a component object.
+        
+        Equivalent to create_component(...).to_dict(), for callers that only need the dict.
+        
+        Args:
+            question_def: Question definition from questions.json
+            current_field: For group/repeat_group questions, the current field being asked
+            
+        Returns:
+            Dict: The component's JSON-ready dictionary
+        """
+        # Use current_field if provided (for group/repeat_group sub-questions)
+        field_def = current_field if current_field else question_def
+        question_type = field_def.get("type", "text")
+        
+        # Choice questions get clickable components, everything else a text input
+        return _COMPONENT_DICT_BUILDERS.get(question_type, _build_text_input_dict)(field_def, question_type)
+    
     @staticmethod
     def _get_text_input_config(field_def: Dict[str, Any]) -> tuple:
         """Get configuration for text input components based on question type."""
-        question_type = field_def.get("type", "text")
-        question_text = field_def.get("question", "").lower()
+        key = (field_def.get("type", "text"), field_def.get("question", ""))
+        config = _TEXT_INPUT_CONFIG_CACHE.get(key)
+        if config is None:
+            config = _TEXT_INPUT_CONFIG_CACHE[key] = UIComponentFactory._compute_text_input_config(*key)
+        return config
+    
+    @staticmethod
+    def _compute_text_input_config(question_type: str, question_text: str) -> tuple:
+        """Work out the (input_type, placeholder, hint) for a question type and wording."""
+        question_text = question_text.lower()
         
         # Configure based on question type
         if question_type == "number":
@@ -179,6 +238,41 @@ class UIComponentFactory:
         return "text", "Enter your answer...", "Please provide your response"
 
 
+def _build_choice_dict(field_def: Dict[str, Any], question_type: str) -> Dict[str, Any]:
+    """Build the clickable component dict for a single or multiple choice question."""
+    allow_multiple = question_type == "multiple_choice"
+    allow_other = field_def.get("other_specify", False)
+    return {
+        "type": "clickable_choice",
+        "question_id": field_def.get("id", "unknown"),
+        "question_text": field_def.get("question", ""),
+        "options": field_def.get("options", []),
+        "allow_multiple": allow_multiple,
+        "allow_other": allow_other,
+        "instructions": _INSTRUCTIONS[allow_multiple, bool(allow_other)]
+    }
+
+
+def _build_text_input_dict(field_def: Dict[str, Any], question_type: str) -> Dict[str, Any]:
+    """Build the text input component dict for any non-choice question."""
+    input_type, placeholder, hint = UIComponentFactory._get_text_input_config(field_def)
+    return {
+        "type": "text_input",
+        "question_id": field_def.get("id", "unknown"),
+        "question_text": field_def.get("question", ""),
+        "input_type": input_type,
+        "placeholder": placeholder,
+        "hint": hint
+    }
+
+
+# Component dict builders by question type; other types fall back to a text input
+_COMPONENT_DICT_BUILDERS = {
+    "single_choice": _build_choice_dict,
+    "multiple_choice": _build_choice_dict,
+}
+
+
 class UIMessageFormatter:
     """Formats bot messages with UI components for web interface."""
     
@@ -231,22 +325,18 @@ class UIMessageFormatter:
         Returns:
             Formatted text content
         """
-        formatted_text = f"❓ {question_text}\n\n"
+        parts = [
+            _QUESTION_PREFIX, question_text,
+            _MULTIPLE_CHOICE_PROMPT if allow_multiple else _SINGLE_CHOICE_PROMPT,
+            # Add text options for reference (in case JavaScript is disabled)
+            "Options:\n"
+        ]
+        parts.extend(f"  {i}. {option}\n" for i, option in enumerate(options, 1))
         
-        if allow_multiple:
-            formatted_text += "You can click one or more options below, or type your answer:\n\n"
-        else:
-            formatted_text += "You can click one option below, or type your answer:\n\n"
-            
-        # Add text options for reference (in case JavaScript is disabled)
-        formatted_text += "Options:\n"
-        for i, option in enumerate(options, 1):
-            formatted_text += f"  {i}. {option}\n"
-            
         if allow_other:
-            formatted_text += "\n💡 You can also specify 'Other' with custom details"
+            parts.append(_OTHER_NOTE)
             
-        return formatted_text
+        return "".join(parts)
     
     @staticmethod
     def format_text_question_text(question_text: str, question_type: str, 
@@ -262,58 +352,45 @@ class UIMessageFormatter:
         Returns:
             Formatted text content
         """
-        formatted_text = f"❓ {question_text}\n\n"
-        
         if hint:
-            formatted_text += f"💡 {hint}\n\n"
-            
-        formatted_text += "Please type your answer below:"
-        
-        return formatted_text
+            return "".join((_QUESTION_PREFIX, question_text, "\n\n💡 ", hint, _TEXT_PROMPT))
+        return "".join((_QUESTION_PREFIX, question_text, _TEXT_PROMPT))
 
 
-def create_ui_message_for_question(question_def: Dict[str, Any], 
-                                 current_field: Optional[Dict[str, Any]] = None,
-                                 progress_info: Optional[Dict[str, Any]] = None,
-                                 retry_info: Optional[Dict[str, Any]] = None,
-                                 completed_questions: Optional[List[str]] = None) -> Dict[str, Any]:
+def _completed_entry(question_id: str) -> Dict[str, Any]:
+    """Build and cache the navigation entry for a completed question."""
+    entry = _COMPLETED_ENTRIES[question_id] = {
+        "question_id": question_id,
+        "enabled": False  # Previous questions not clickable
+    }
+    return entry
+
+
+def create_ui_message_template(question_def: Dict[str, Any],
+                               current_field: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
-    Convenience function to create a complete UI message for a question.
+    Build the static part of a question's UI message.
+    
+    The template only depends on the question definition, so it can be built
+    once per question/field and reused for every prompt of that question.
     
     Args:
         question_def: Question definition from questions.json
         current_field: For group/repeat_group questions, the current field
-        progress_info: Progress information (current/total)
-        retry_info: Retry information if validation failed
-        completed_questions: List of completed question IDs for navigation context
         
     Returns:
-        Complete message dictionary ready for web interface
+        Dict with the formatted question "text" and the "ui_component" dict
     """
     # Use current_field if provided (for group/repeat_group sub-questions)
     field_def = current_field if current_field else question_def
     
-    # Create UI component
-    ui_component = UIComponentFactory.create_component(question_def, current_field)
-    
-    # Add navigation context to UI component
-    ui_component_dict = ui_component.to_dict()
+    # Build the UI component dict and add navigation context
+    ui_component_dict = UIComponentFactory.build_dict(question_def, current_field)
     ui_component_dict["is_current_question"] = True
     ui_component_dict["enabled"] = True  # Only current questions are enabled for clicking
     
-    # Disable previous questions to prevent clickable navigation
-    # Users should use "change reply" command instead
-    if completed_questions:
-        ui_component_dict["completed_questions"] = [
-            {
-                "question_id": q_id,
-                "enabled": False  # Previous questions not clickable
-            }
-            for q_id in completed_questions
-        ]
-    
     # Format text content based on component type
-    if isinstance(ui_component, ClickableChoiceComponent):
+    if ui_component_dict["type"] == "clickable_choice":
         text_content = UIMessageFormatter.format_choice_question_text(
             field_def.get("question", ""),
             field_def.get("options", []),
@@ -324,20 +401,59 @@ def create_ui_message_for_question(question_def: Dict[str, Any],
         text_content = UIMessageFormatter.format_text_question_text(
             field_def.get("question", ""),
             field_def.get("type", "text"),
-            ui_component.hint if hasattr(ui_component, 'hint') else ""
+            ui_component_dict["hint"]
         )
     
-    # Add retry error message if provided
-    if retry_info and retry_info.get("error"):
-        text_content = f"❌ {retry_info['error']}\nLet me ask that again...\n\n{text_content}"
+    return {"text": text_content, "ui_component": ui_component_dict}
+
+
+def create_ui_message_for_question(question_def: Dict[str, Any], 
+                                 current_field: Optional[Dict[str, Any]] = None,
+                                 progress_info: Optional[Dict[str, Any]] = None,
+                                 retry_info: Optional[Dict[str, Any]] = None,
+                                 completed_questions: Optional[Iterable[str]] = None,
+                                 template: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Convenience function to create a complete UI message for a question.
+    
+    Args:
+        question_def: Question definition from questions.json
+        current_field: For group/repeat_group questions, the current field
+        progress_info: Progress information (current/total)
+        retry_info: Retry information if validation failed
+        completed_questions: Completed question IDs (in completion order) for navigation context
+        template: Precomputed result of create_ui_message_template for this question
+        
+    Returns:
+        Complete message dictionary ready for web interface
+    """
+    if template is None:
+        template = create_ui_message_template(question_def, current_field)
+    
+    # Copy the static component so per-prompt keys don't leak into the template
+    ui_component_dict = dict(template["ui_component"])
+    text_content = template["text"]
+    
+    # Disable previous questions to prevent clickable navigation
+    # Users should use "change reply" command instead
+    if completed_questions:
+        ui_component_dict["completed_questions"] = [
+            _COMPLETED_ENTRIES.get(q_id) or _completed_entry(q_id)
+            for q_id in completed_questions
+        ]
     
-    # Add progress information to text if available
+    # Prefix the progress line and any retry error message, joined in one pass
+    prefix = []
     if progress_info:
         current = progress_info.get("current", 0)
         total = progress_info.get("total", 0)
         if current > 0 and total > 0:
-            progress_text = f"📋 Question {current}/{total}\n" + "-" * 40 + "\n\n"
-            text_content = progress_text + text_content
+            prefix.append(_PROGRESS_FMT.format(current, total))
+    if retry_info and retry_info.get("error"):
+        prefix += ("❌ ", retry_info["error"], _RETRY_SUFFIX)
+    if prefix:
+        prefix.append(text_content)
+        text_content = "".join(prefix)
     
     # Create complete message
     return UIMessageFormatter.create_ui_message(
@@ -348,6 +464,24 @@ def create_ui_message_for_question(question_def: Dict[str, Any],
     )
 
 
+def dumps_ui_message(message: Dict[str, Any]) -> str:
+    """
+    Serialize a UI message for the web interface.
+    
+    Uses orjson when it is installed. The result is a str because it travels as
+    chat message content and Socket.IO text.
+    
+    Args:
+        message: Message dict from create_ui_message_for_question
+        
+    Returns:
+        JSON text of the message
+    """
+    if orjson is not None:
+        return orjson.dumps(message).decode()
+    return json.dumps(message)
+
+
 def parse_ui_response(user_input: str, ui_component_data: Optional[Dict[str, Any]] = None) -> Tuple[str, Optional[str]]:
     """
     Parse user response from UI interactions or text input.
@@ -363,33 +497,33 @@ def parse_ui_response(user_input: str, ui_component_data: Optional[Dict[str, Any
         Tuple of (processed_user_input, edited_question_id)
         edited_question_id is always None since navigation edits are disabled
     """
-    # If input looks like a UI component response (JSON), parse it
-    if user_input.strip().startswith("{") and user_input.strip().endswith("}"):
-        try:
-            ui_response = json.loads(user_input)
-            
-            # Handle clickable choice responses (navigation edits are disabled)
-            if ui_response.get("type") == "choice_selection":
-                selected_options = ui_response.get("selected_options", [])
-                other_text = ui_response.get("other_text", "")
-                
-                if len(selected_options) == 1 and not other_text:
-                    # Single selection
-                    return selected_options[0], None
-                elif len(selected_options) == 1 and selected_options[0].lower() == "other" and other_text:
-                    # Other option with specification
-                    return f"Other: {other_text}", None
-                elif len(selected_options) > 1:
-                    # Multiple selections
-                    return ", ".join(selected_options), None
-                else:
-                    # Fallback to raw input
-                    return user_input, None
-                    
-        except json.JSONDecodeError:
-            pass  # Not JSON, treat as regular text input
+    # Plain text answers (the common case) never reach the JSON parser
+    stripped = user_input.strip()
+    if not (stripped[:1] == "{" and stripped[-1:] == "}"):
+        return user_input, None
+    
+    # Input looks like a UI component response (JSON), parse it
+    try:
+        ui_response = _json_loads(stripped)
+    except json.JSONDecodeError:
+        return user_input, None  # Not JSON, treat as regular text input
+    
+    # Handle clickable choice responses (navigation edits are disabled)
+    if ui_response.get("type") == "choice_selection":
+        selected_options = ui_response.get("selected_options", [])
+        other_text = ui_response.get("other_text", "")
+        
+        if len(selected_options) == 1 and not other_text:
+            # Single selection
+            return selected_options[0], None
+        elif len(selected_options) == 1 and selected_options[0].lower() == "other" and other_text:
+            # Other option with specification
+            return f"Other: {other_text}", None
+        elif len(selected_options) > 1:
+            # Multiple selections
+            return ", ".join(selected_options), None
     
-    # Return as-is for regular text input
+    # Return as-is for regular text input and unrecognised payloads
     return user_input, None
 
 
@@ -400,6 +534,8 @@ __all__ = [
     'TextInputComponent',
     'UIComponentFactory',
     'UIMessageFormatter',
+    'create_ui_message_template',
     'create_ui_message_for_question',
+    'dumps_ui_message',
     'parse_ui_response'
 ]
@@ -1,8 +1,35 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, FrozenSet, List, Tuple
+from dataclasses import dataclass
+from datetime import date, time
+from functools import lru_cache
 from dateutil import parser as dt_parser
 import re
 import json
+try:
+    import orjson
+except ImportError:  # Optional: group replies are decoded with stdlib json instead
+    orjson = None
+
+# JSON decoder for group replies; orjson.JSONDecodeError subclasses json.JSONDecodeError
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Patterns used on every reply, compiled once
+_RE_NUM = re.compile(r'-?\d+(?:\.\d+)?')
+_RE_CLOCK = re.compile(r'(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?')
+_RE_SEP_SPACING = re.compile(r'\s*([/-])\s*')
+# Comma/semicolon separated parts with surrounding whitespace stripped and blank parts dropped
+_RE_CHOICE_PARTS = re.compile(r'\s*([^,;\s][^,;]*?)\s*(?=[,;]|\Z)')
+# "other 4", "4 other", "other: 4" and "other - 4"; exactly one group is set on a match
+_RE_OTHER = re.compile(r'^(?:other\s+(.+)|(.+)\s+other|other:\s*(.+)|other\s*-\s*(.+))$', re.IGNORECASE)
+
+# Types whose result depends only on the reply text and is immutable, so it can be
+# reused across questions. Dates are left out: dateutil fills missing parts from today
+_REPLY_ONLY_TYPES = frozenset({"time", "number", "boolean"})
+_RESULT_CACHE_SIZE = 1024
+_RESULT_CACHE: Dict[Tuple[str, str], Tuple[bool, Any]] = {}
+
+_TEXT_TYPES = frozenset({"text", "multiline_text"})
 
 def validate_answer(q_def: Dict[str, Any], reply: str) -> Tuple[bool, Any]:
     """
@@ -11,38 +38,44 @@ def validate_answer(q_def: Dict[str, Any], reply: str) -> Tuple[bool, Any]:
     element holds an error string explaining the problem.
     """
     q_type = q_def["type"]
+    parse = _VALIDATORS.get(q_type)
+    if parse is None:
+        return False, f"Unknown q_type \"{q_type}\""
 
+    # Retries and edits resubmit the same replies, so reply-only results are cached
+    if q_type in _REPLY_ONLY_TYPES and isinstance(reply, str):
+        key = (q_type, reply)
+        result = _RESULT_CACHE.get(key)
+        if result is None:
+            if len(_RESULT_CACHE) >= _RESULT_CACHE_SIZE:
+                _RESULT_CACHE.clear()
+            result = _RESULT_CACHE[key] = _run_parser(parse, reply, q_def)
+        return result
+
+    return _run_parser(parse, reply, q_def)
+
+def _run_parser(parse, reply: str, q_def: Dict[str, Any]) -> Tuple[bool, Any]:
     try:
-        if q_type == "date":
-            value = _parse_date(reply)
-        elif q_type == "time":
-            value = _parse_time(reply)
-        elif q_type in {"text", "multiline_text"}:
-            value = reply.strip()
-            # Allow blank text for optional fields (those with "(optional)" in question text)
-            if not value and not q_def.get("question", "").lower().endswith("(optional)"):
-                raise ValueError("blank text")
-        elif q_type == "number":
-            value = _parse_number(reply)
-        elif q_type == "boolean":
-            value = _parse_bool(reply)
-        elif q_type in {"single_choice", "multiple_choice"}:
-            value = _parse_choice(reply, q_def, multi=(q_type == "multiple_choice"))
-        elif q_type == "group":
-            value = _parse_group(reply, q_def)
-        elif q_type == "repeat_group":
-            value = _parse_repeat_group(reply, q_def)
-        elif q_type == "table":
-            value = _parse_table(reply, q_def)
-        else:
-            return False, f"Unknown q_type \"{q_type}\""
+        return True, parse(reply, q_def)
     except ValueError as err:
         return False, str(err)
 
-    return True, value
+def _parse_text(reply: str, q_def: Dict[str, Any]):
+    value = reply.strip()
+    # Allow blank text for optional fields (those with "(optional)" in question text)
+    if not value and not _is_optional_text(q_def):
+        raise ValueError("blank text")
+    return value
+
+def _is_optional_text(q_def: Dict[str, Any]) -> bool:
+    return q_def.get("question", "").lower().endswith("(optional)")
 
 def _parse_date(s: str):
-    return dt_parser.parse(s).date()
+    # ISO dates (the web UI's format) parse in C; anything else goes through dateutil
+    try:
+        return date.fromisoformat(s.strip())
+    except ValueError:
+        return dt_parser.parse(s).date()
 
 def _parse_time(s: str):
     s = s.strip()
@@ -53,7 +86,7 @@ def _parse_time(s: str):
     
     # Try to parse the time
     try:
-        parsed_time = dt_parser.parse(s).time()
+        parsed_time = _parse_time_fast(s) or dt_parser.parse(s).time()
         # Additional validation - if seconds weren't specified, make sure it's reasonable
         if parsed_time.hour == 0 and parsed_time.minute == 0 and parsed_time.second == 0 and s != "00:00" and s != "0:00":
             raise ValueError("Time format unclear. Please use HH:MM format (e.g., 14:35 or 02:00)")
@@ -61,176 +94,213 @@ def _parse_time(s: str):
     except Exception:
         raise ValueError("Invalid time format. Please use HH:MM format (e.g., 14:35 or 02:00)")
 
+def _parse_time_fast(s: str):
+    """Parse H:MM or HH:MM:SS without dateutil; returns None for other layouts."""
+    match = _RE_CLOCK.fullmatch(s)
+    if match is None:
+        return None
+    hour, minute, second = match.groups()
+    try:
+        return time(int(hour), int(minute), int(second or 0))
+    except ValueError:
+        return None
+
+# Written numbers accepted for number questions
+_WORD_TO_NUM = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15,
+    'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19, 'twenty': 20,
+    'thirty': 30, 'forty': 40, 'fifty': 50, 'sixty': 60, 'seventy': 70,
+    'eighty': 80, 'ninety': 90, 'hundred': 100
+}
+
 def _parse_number(s: str):
     # Extract numeric part from strings like "30 kmh", "thirty", etc.
     s = s.strip().lower()
     
     # Handle written numbers
-    word_to_num = {
-        'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-        'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-        'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15,
-        'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19, 'twenty': 20,
-        'thirty': 30, 'forty': 40, 'fifty': 50, 'sixty': 60, 'seventy': 70,
-        'eighty': 80, 'ninety': 90, 'hundred': 100
-    }
-    
-    if s in word_to_num:
-        return word_to_num[s]
+    if s in _WORD_TO_NUM:
+        return _WORD_TO_NUM[s]
     
     # Extract numbers from strings with units (e.g., "30 kmh", "50 km/h")
-    import re
-    num_match = re.search(r'-?\d+(?:\.\d+)?', s)
+    num_match = _RE_NUM.search(s)
     if num_match:
         num_str = num_match.group()
-        return int(num_str) if re.fullmatch(r"-?\d+", num_str) else float(num_str)
+        return float(num_str) if '.' in num_str else int(num_str)
     
-    # Fallback to original parsing
-    return int(s) if re.fullmatch(r"-?\d+", s.strip()) else float(s)
+    # No digits at all; float() still accepts spellings like "inf" and "nan"
+    return float(s)
 
-_BOOL_TRUE = {"yes", "y", "true", "t", "1"}
-_BOOL_FALSE = {"no", "n", "false", "f", "0"}
+_BOOL_MAP = {
+    "yes": True, "y": True, "true": True, "t": True, "1": True,
+    "no": False, "n": False, "false": False, "f": False, "0": False,
+}
 def _parse_bool(s: str):
-    lowered = s.strip().lower()
-    if lowered in _BOOL_TRUE:
-        return True
-    if lowered in _BOOL_FALSE:
-        return False
-    raise ValueError("expected yes/no or true/false")
+    value = _BOOL_MAP.get(s.strip().lower())
+    if value is None:
+        raise ValueError("expected yes/no or true/false")
+    return value
 
+# Dash variants (en dash, em dash, minus, hyphen, non-breaking hyphen) and curly quotes
+_NORMALIZE_TRANS = str.maketrans({
+    '\u2013': '-', '\u2014': '-', '\u2212': '-', '\u2010': '-', '\u2011': '-',
+    '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"',
+})
+
+@lru_cache(maxsize=2048)
 def _normalize_text(text: str) -> str:
     """Normalize text for comparison by handling common character variations."""
-    text = text.lower().strip()
-    # Replace various dash types with regular hyphen
-    text = text.replace('–', '-').replace('—', '-').replace('−', '-')  # em dash, en dash, minus
-    # Replace various quote types
-    text = text.replace(''', "'").replace(''', "'").replace('"', '"').replace('"', '"')
-    # Normalize spacing around slashes and hyphens
-    text = re.sub(r'\s*/\s*', '/', text)  # "snow / ice" -> "snow/ice"
-    text = re.sub(r'\s*-\s*', '-', text)  # "dark - lit" -> "dark-lit"
+    text = text.strip()
+    if text.isascii():
+        text = text.lower()
+    else:
+        # Map dash and curly-quote variants to ASCII in a single pass; plain ASCII has none
+        text = text.casefold().translate(_NORMALIZE_TRANS)
+    # Drop spacing around slashes and hyphens: "snow / ice" -> "snow/ice", "dark - lit" -> "dark-lit"
+    text = _RE_SEP_SPACING.sub(r'\1', text)
     # Remove extra whitespace
-    text = ' '.join(text.split())
-    return text
+    return ' '.join(text.split())
+
+@dataclass(frozen=True, slots=True)
+class _ChoiceOptions:
+    """Lookup tables for one option list, derived once and reused for every reply."""
+    by_key: Dict[str, str]  # Normalized text -> option
+    by_words: Dict[FrozenSet[str], int]  # Word set -> position of the first option in by_key with those words
+    numeric: bool  # Every option is a number or "Other", e.g. a vehicle count
+    numeric_values: FrozenSet[int]  # The numbers among the options
+    
+    @classmethod
+    def of(cls, options: Tuple[str, ...]) -> "_ChoiceOptions":
+        by_key = {_normalize_text(o): o for o in options}
+        by_words: Dict[FrozenSet[str], int] = {}
+        for i, k in enumerate(by_key):
+            by_words.setdefault(_word_set(k), i)
+        return cls(
+            by_key,
+            by_words,
+            all(o.isdigit() or o == "Other" for o in options),
+            frozenset(int(o) for o in options if o.isdigit()),
+        )
+
+# Keyed by the option tuple so questions sharing a list share the tables
+_OPTS_CACHE: Dict[Tuple[str, ...], _ChoiceOptions] = {}
+
+def _opts_for(q_def: Dict[str, Any]) -> _ChoiceOptions:
+    """Return the option lookup tables for a choice question, building them on first use."""
+    options = tuple(q_def["options"])
+    opts = _OPTS_CACHE.get(options)
+    if opts is None:
+        opts = _OPTS_CACHE[options] = _ChoiceOptions.of(options)
+    return opts
+
+# Replies that mean "other" without saying what
+_BARE_OTHER = frozenset({"other", "else", "different", "something else", "misc", "miscellaneous"})
 
 def _parse_choice(s: str, q_def: Dict[str, Any], *, multi: bool):
-    raw = [p.strip() for p in re.split(r",|;", s) if p.strip()] if multi else [s.strip()]
-    opts = {_normalize_text(o): o for o in q_def["options"]}
+    raw = _RE_CHOICE_PARTS.findall(s) if multi else [s.strip()]
+    choice_options = _opts_for(q_def)
+    opts = choice_options.by_key
+    other_specify = q_def.get("other_specify")
     canonical: List[str] = []
 
     for part in raw:
         key = _normalize_text(part.rstrip('.'))
         
-        # Check if it's a compound "other" response like "other 4" or "4 vehicles"
-        if q_def.get("other_specify"):
-            # Handle various "other" patterns
-            other_patterns = [
-                r'^other\s+(.+)',  # "other 4"
-                r'^(.+)\s+other$',  # "4 other" 
-                r'^other:\s*(.+)',  # "other: 4"
-                r'^other\s*-\s*(.+)',  # "other - 4"
-            ]
-            
-            for pattern in other_patterns:
-                other_match = re.search(pattern, key, re.IGNORECASE)
-                if other_match:
-                    specification = other_match.group(1).strip()
-                    if specification:
-                        return {"choice": "Other", "other": specification}
-            
-            # If just "other" alone - ask for specification  
-            if key.lower() in ["other", "else", "different", "something else", "misc", "miscellaneous"]:
-                raise ValueError("Please specify what 'other' option you mean (e.g., '4 vehicles' or 'other: heavy blizzard')")
-            
-            # If it's not a match for existing options but other_specify is true, 
-            # treat any unmatched input as an "other" specification
-            unmatched_as_other = True
-        else:
-            unmatched_as_other = False
+        # If just "other" alone - ask for specification, even though "Other" is itself an option
+        if other_specify and key in _BARE_OTHER:
+            raise ValueError("Please specify what 'other' option you mean (e.g., '4 vehicles' or 'other: heavy blizzard')")
         
         # Check direct text match first (most explicit)
         if key in opts:
             canonical.append(opts[key])
-        else:
-            found_match = False
-            
-            # Check if it's a number that could be either an index or a value
-            if key.isdigit():
-                idx = int(key) - 1
-                # If it's a valid 1-based index for the options
-                if 0 <= idx < len(q_def["options"]):
-                    # But if it's a numeric value question with other_specify, 
-                    # prefer treating it as a value rather than index
-                    # (e.g., "4" for vehicle count should mean "4 vehicles", not "4th option")
-                    if (q_def.get("other_specify") and 
-                        all(opt.isdigit() or opt == "Other" for opt in q_def["options"]) and
-                        int(key) not in [int(opt) for opt in q_def["options"] if opt.isdigit()]):
-                        # This number is not in the explicit options, treat as "other" value
-                        return {"choice": "Other", "other": part}
-                    else:
-                        # Normal index selection
-                        canonical.append(q_def["options"][idx])
-                        found_match = True
-                # If it's a number but not a valid index, and other_specify is True
-                elif q_def.get("other_specify"):
+            continue
+        
+        # Check if it's a compound "other" response like "other 4" or "4 other";
+        # every pattern starts or ends with "other", so most replies skip the regex
+        if other_specify and (key.startswith("other") or key.endswith("other")):
+            other_match = _RE_OTHER.match(key)
+            if other_match:
+                specification = next(g for g in other_match.groups() if g is not None).strip()
+                if specification:
+                    return {"choice": "Other", "other": specification}
+        
+        found_match = False
+        
+        # Check if it's a number that could be either an index or a value
+        if key.isdigit():
+            idx = int(key) - 1
+            # If it's a valid 1-based index for the options
+            if 0 <= idx < len(q_def["options"]):
+                # But if it's a numeric value question with other_specify, 
+                # prefer treating it as a value rather than index
+                # (e.g., "4" for vehicle count should mean "4 vehicles", not "4th option")
+                if (other_specify and choice_options.numeric and
+                    int(key) not in choice_options.numeric_values):
+                    # This number is not in the explicit options, treat as "other" value
                     return {"choice": "Other", "other": part}
-            
-            if not found_match:
-                # Check if the user input contains any of the option words (fuzzy matching)
-                for option_key, option_value in opts.items():
-                    # Handle special case where option is "None" and user types "none"
-                    if _normalize_text(option_value) == "none" and key == "none":
-                        canonical.append(option_value)
-                        found_match = True
-                        break
-                    # Check if either string contains the other (partial matching)
-                    elif option_key in key or key in option_key:
-                        canonical.append(option_value)
-                        found_match = True
-                        break
-                    # Check for word-based matching with flexible separators
-                    elif _flexible_word_match(key, option_key):
-                        canonical.append(option_value)
-                        found_match = True
-                        break
-            
-            if not found_match:
-                if unmatched_as_other:
-                    # Treat unmatched input as "other" specification
-                    if multi:
-                        canonical.append(part)
-                        return {"choices": canonical, "other": part}
-                    else:
-                        return {"choice": "Other", "other": part}
                 else:
-                    raise ValueError(f"\"{part}\" not a valid option")
+                    # Normal index selection
+                    canonical.append(q_def["options"][idx])
+                    found_match = True
+            # If it's a number but not a valid index, and other_specify is True
+            elif other_specify:
+                return {"choice": "Other", "other": part}
+        
+        if not found_match:
+            # Check if the user input contains any of the option words (fuzzy matching)
+            # First option whose words match with flexible separators, found by lookup
+            word_match = choice_options.by_words.get(_word_set(key))
+            for i, (option_key, option_value) in enumerate(opts.items()):
+                # Check for that word match, or if either string contains the other (partial matching)
+                if i == word_match or option_key in key or key in option_key:
+                    canonical.append(option_value)
+                    found_match = True
+                    break
+        
+        if not found_match:
+            if other_specify:
+                # Treat unmatched input as "other" specification
+                if multi:
+                    canonical.append(part)
+                    return {"choices": canonical, "other": part}
+                else:
+                    return {"choice": "Other", "other": part}
+            else:
+                raise ValueError(f"\"{part}\" not a valid option")
 
     if multi:
         return canonical
     else:
         return canonical[0] if canonical else None
 
+# Hyphens and slashes separate words just like spaces
+_SEP_TRANS = str.maketrans('-/', '  ')
+
+def _word_set(text: str) -> FrozenSet[str]:
+    """Split text into its set of words, treating hyphens, slashes and spaces alike."""
+    return frozenset(text.lower().translate(_SEP_TRANS).split())
+
 def _flexible_word_match(input_text: str, option_text: str) -> bool:
     """Check if two texts match when considering flexible word separators."""
-    # Split by common separators and compare word sets
-    input_words = re.split(r'[-/\s]+', input_text.lower())
-    option_words = re.split(r'[-/\s]+', option_text.lower())
-    
-    # Remove empty strings
-    input_words = [w for w in input_words if w]
-    option_words = [w for w in option_words if w]
-    
-    # Check if word sets are equal
-    return set(input_words) == set(option_words)
+    return _word_set(input_text) == _word_set(option_text)
 
-def _parse_group(reply: str, q_def: Dict[str, Any]):
+def _parse_group_str(reply: str, q_def: Dict[str, Any]):
     try:
-        obj = json.loads(reply)
+        obj = _json_loads(reply)
     except json.JSONDecodeError:
         raise ValueError("group reply must be JSON")
+    return _parse_group_obj(obj, q_def)
 
+def _parse_group_obj(obj: Dict[str, Any], q_def: Dict[str, Any]):
     parsed = {}
     for fld in q_def["fields"]:
-        ok, val = validate_answer(fld, obj.get(fld["id"], ""))
+        value = obj.get(fld["id"], "")
+        # A missing or blank optional text field is stored blank without a full validation
+        if value == "" and fld["type"] in _TEXT_TYPES and _is_optional_text(fld):
+            parsed[fld["id"]] = ""
+            continue
+        ok, val = validate_answer(fld, value)
         if not ok:
             raise ValueError(f"{fld['id']}: {val}")
         parsed[fld["id"]] = val
@@ -238,17 +308,32 @@ def _parse_group(reply: str, q_def: Dict[str, Any]):
 
 def _parse_repeat_group(reply: str, q_def: Dict[str, Any]):
     try:
-        arr = json.loads(reply)
+        arr = _json_loads(reply)
         assert isinstance(arr, list)
     except Exception:
         raise ValueError("repeat_group reply must be JSON list")
 
-    return [_parse_group(json.dumps(elem), {"type": "group", "fields": q_def["fields"]})
-            for elem in arr]
+    # Elements are already parsed, so they go straight to the field validation
+    return [_parse_group_obj(elem, q_def) for elem in arr]
 
 def _parse_table(reply: str, q_def: Dict[str, Any]):
     return _parse_repeat_group(reply, {"type": "repeat_group", "fields": q_def["columns"]})
 
+# Reply parser per question type; each takes (reply, q_def) and raises ValueError on bad input
+_VALIDATORS = {
+    "date": lambda reply, q_def: _parse_date(reply),
+    "time": lambda reply, q_def: _parse_time(reply),
+    "text": _parse_text,
+    "multiline_text": _parse_text,
+    "number": lambda reply, q_def: _parse_number(reply),
+    "boolean": lambda reply, q_def: _parse_bool(reply),
+    "single_choice": lambda reply, q_def: _parse_choice(reply, q_def, multi=False),
+    "multiple_choice": lambda reply, q_def: _parse_choice(reply, q_def, multi=True),
+    "group": _parse_group_str,
+    "repeat_group": _parse_repeat_group,
+    "table": _parse_table,
+}
+
 def type_check(desired_type, value, node_name=None):
     ok, _ = validate_answer(desired_type, value)
     return "next_node" if ok else node_name
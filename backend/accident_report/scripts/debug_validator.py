@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 import sys
-sys.path.append('/home/qte9306/Documents/WebWoz_Home/WebWOz/backend/accident_report/rule_based')
+from pathlib import Path
+
+# Add the repository root to path so the backend package imports resolve
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
 
 from backend.accident_report.rule_based.validator import _normalize_text
 
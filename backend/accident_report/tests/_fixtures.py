@@ -0,0 +1,41 @@
+"""
+Shared fixtures for the accident report test scripts.
+
+The questionnaire is resolved relative to this file, so tests work from any
+working directory, and it is parsed at most once per test run.
+"""
+
+import json
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+try:
+    import orjson
+except ImportError:  # Optional: falls back to stdlib json
+    orjson = None
+
+# The questionnaire every test runs against
+QUESTIONS_FILE = str(Path(__file__).resolve().parent.parent / "questionnaire" / "questions.json")
+
+# shared_workflow imports through the backend package, so the repository root must be
+# importable when a test file is run directly as a script
+PROJECT_ROOT = str(Path(__file__).resolve().parents[3])
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+
+@lru_cache(maxsize=1)
+def load_questions(path: str = QUESTIONS_FILE) -> Dict[str, Any]:
+    """Load and parse a questions JSON file, reusing the parsed copy on later calls."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def shared_workflow():
+    """Return a non-interactive FormWorkflow built once and reused across tests."""
+    from backend.accident_report.rule_based.bot_naive import FormWorkflow
+    return FormWorkflow(QUESTIONS_FILE, interactive=False)
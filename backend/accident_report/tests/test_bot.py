@@ -7,14 +7,13 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..
 sys.path.insert(0, project_root)
 
 from backend.accident_report.rule_based.bot_naive import FormWorkflow
-import json
+from _fixtures import load_questions
 
 def test_bot_simple():
     """Test the bot with simulated inputs"""
     
-    # Load questions to understand structure
-    with open('../questionnaire/questions.json', 'r') as f:
-        questions = json.load(f)
+    # Load questions to understand structure (parsed once per run, shared with other tests)
+    questions = load_questions()
     
     print("Questions loaded:")
     for i, q in enumerate(questions["questions"][:5]):  # First 5 questions
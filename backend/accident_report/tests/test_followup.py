@@ -11,6 +11,8 @@ from pathlib import Path
 BACKEND_DIR = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(BACKEND_DIR))
 
+from _fixtures import shared_workflow
+
 try:
     from bot_integration import WebBotSession
     print("✅ Successfully imported WebBotSession")
@@ -103,17 +105,11 @@ def test_simple_followup():
     is_valid, result = validate_answer(bool_question, "yes")
     print(f"Boolean validation: 'yes' -> {is_valid}, {result}")
     
-    # Test follow-up logic in the FormWorkflow
-    from backend.accident_report.rule_based.bot_naive import FormWorkflow
-    
-    workflow = FormWorkflow("../questionnaire/questions.json", interactive=False)
+    # Test follow-up logic in the shared FormWorkflow
+    workflow = shared_workflow()
     
     # Find the injury question
-    injury_question = None
-    for q in workflow.questions:
-        if q["id"] == "any_injuries":
-            injury_question = q
-            break
+    injury_question = workflow.questions_by_id.get("any_injuries")
     
     if injury_question:
         print(f"✅ Found injury question: {injury_question['question']}")
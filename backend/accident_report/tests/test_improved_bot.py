@@ -14,6 +14,7 @@ try:
     # Import required modules
     from backend.accident_report.rule_based.bot_naive import FormWorkflow
     from backend.accident_report.rule_based.validator import validate_answer
+    from _fixtures import QUESTIONS_FILE
     import json
     
     print("✅ All imports successful!")
@@ -43,7 +44,7 @@ try:
     print("\n🏗️ Testing FormWorkflow initialization...")
     
     # Test form workflow initialization (but don't run it interactively)
-    questions_file = "../questionnaire/questions.json"
+    questions_file = QUESTIONS_FILE
     if os.path.exists(questions_file):
         workflow = FormWorkflow(questions_file, interactive=False)
         print("✅ FormWorkflow initialized successfully!")
@@ -10,18 +10,17 @@ import os
 import sys
 from pathlib import Path
 
-# Add the rule_based directory to path
-RULE_BASED_DIR = Path(__file__).parent.parent / "rule_based"
-sys.path.insert(0, str(RULE_BASED_DIR))
+# Add the backend directory to path for the web session integration
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from bot_naive import FormWorkflow
+from _fixtures import shared_workflow
 
 def test_navigation_detection():
     """Test the simplified navigation intent detection functionality."""
     print("🧪 Testing Simplified Navigation Intent Detection")
     print("=" * 50)
     
-    workflow = FormWorkflow(interactive=False)
+    workflow = shared_workflow()
     
     # Test cases for navigation detection
     test_cases = [
@@ -45,6 +44,23 @@ def test_navigation_detection():
         status = "✅" if result == expected else "❌"
         print(f"{status} '{test_input}' -> Navigation: {result}")
 
+def test_change_reply_in_web_session():
+    """In a web session "change reply" is taken as an answer, not a navigation request."""
+    from bot_integration import WebBotSession
+    
+    session = WebBotSession("navigation_web_test")
+    session.start()
+    for answer in ["Rear-end collision", "2025-06-12", "14:35"]:
+        session.process_message(answer)
+    question_before = session.current_state["current_question_id"]
+    
+    response = session.process_message("change reply")
+    
+    assert response is not None
+    assert not session.current_state.get("navigation_request")
+    assert session.current_state["current_question_id"] != question_before
+    print(f"✅ 'change reply' answered {question_before}, now at {session.current_state['current_question_id']}")
+
 def demo_navigation_workflow():
     """Demonstrate the simplified navigation workflow."""
     print("\n🎭 Simplified Navigation Workflow Demo")
@@ -68,6 +84,7 @@ def demo_navigation_workflow():
 if __name__ == "__main__":
     try:
         test_navigation_detection()
+        test_change_reply_in_web_session()
         demo_navigation_workflow()
         print("\n✅ Simplified navigation feature tests completed successfully!")
         print("\n💡 To test navigation interactively:")
@@ -5,13 +5,13 @@ This script simulates user input to test the bot without requiring interactive i
 """
 
 import json
-from backend.accident_report.rule_based.bot_naive import FormWorkflow
+from _fixtures import shared_workflow
 
 def test_vehicle_questions():
     """Test that the bot handles vehicle questions in a user-friendly way."""
     
-    # Create the workflow in non-interactive mode for testing
-    workflow = FormWorkflow("../questionnaire/questions.json", interactive=False)
+    # Reuse the shared non-interactive workflow
+    workflow = shared_workflow()
     graph = workflow.compile_graph()
     
     # Test configuration
@@ -32,11 +32,7 @@ def test_vehicle_questions():
     print(f"Form initialized with question: {initial_state['current_question_id']}")
     
     # Test if we can properly identify the vehicle question
-    vehicle_question = None
-    for q in workflow.questions:
-        if q["id"] == "vehicles":
-            vehicle_question = q
-            break
+    vehicle_question = workflow.questions_by_id.get("vehicles")
     
     if vehicle_question:
         print(f"Found vehicle question: {vehicle_question['question']}")
@@ -58,14 +54,10 @@ def test_vehicle_questions():
 
 def test_group_questions():
     """Test that group questions work properly."""
-    workflow = FormWorkflow("../questionnaire/questions.json", interactive=False)
+    workflow = shared_workflow()
     
     # Find a group question
-    group_question = None
-    for q in workflow.questions:
-        if q["type"] == "group":
-            group_question = q
-            break
+    group_question = workflow.questions_by_type.get("group", [None])[0]
     
     if group_question:
         print(f"\nFound group question: {group_question['question']}")
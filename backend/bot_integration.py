@@ -6,8 +6,17 @@ This module adapts the rule-based bot to work with Socket.IO communication.
 import json
 import os
 import sys
-from typing import Dict, Any, Optional, List, Tuple
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Any, Optional, List, Tuple, Union
 from pathlib import Path
+try:
+    import orjson
+except ImportError:  # Optional: UI message replies are parsed with stdlib json instead
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the stdlib type
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # Add the accident_report directory to Python path for imports
 BACKEND_DIR = Path(__file__).parent
@@ -23,6 +32,7 @@ try:
     # Try direct imports from rule_based directory
     from rule_based.validator import validate_answer
     from rule_based.bot_naive import FormState, FormWorkflow
+    from langgraph.types import Command
     
     BOT_IMPORTS_SUCCESSFUL = True
     print("✅ Bot components imported successfully")
@@ -43,6 +53,7 @@ except ImportError as e:
     try:
         from backend.accident_report.rule_based.validator import validate_answer
         from backend.accident_report.rule_based.bot_naive import FormState, FormWorkflow
+        from langgraph.types import Command
         BOT_IMPORTS_SUCCESSFUL = True
         print("✅ Bot components imported successfully (Docker path)")
     except ImportError as e2:
@@ -51,6 +62,7 @@ except ImportError as e:
         FormWorkflow = None
         validate_answer = None
         FormState = None
+        Command = None
         BOT_IMPORTS_SUCCESSFUL = False
 
 # Try to import AI bot components
@@ -72,11 +84,51 @@ except ImportError as e:
         HumanMessage = None
         AI_BOT_IMPORTS_SUCCESSFUL = False
 
+# Prebuilt (workflow, graph) pairs keyed by questions file, see WebBotSession.preload_schema
+_PRELOADED_SCHEMAS: Dict[str, Tuple[Any, Any]] = {}
+
+class ResponseStatus(str, Enum):
+    """Statuses reported by WebBotSession.process_message/process_batch with raw=True."""
+    OK = "ok"            # answer accepted, the next question is pending
+    INVALID = "invalid"  # answer rejected, the same question is asked again
+    DONE = "done"        # answer accepted and the form is complete
+    ERROR = "error"      # processing failed or the session was lost
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessResult:
+    """Outcome of one user message, returned instead of the rendered reply in raw mode."""
+    status: ResponseStatus
+    question_id: Optional[str] = None
+
 
 class WebBotSession:
     """Web-compatible bot session that handles Socket.IO communication."""
     
-    def __init__(self, room_id: str, questions_file: str = None):
+    @classmethod
+    def preload_schema(cls, questions_file: str = None) -> Tuple[Any, Any]:
+        """Build the workflow and compiled graph for a questions file once per process.
+        
+        The pair can be passed to the constructor so many sessions share one question
+        tree. They also share the graph's checkpointer, so room IDs must be unique.
+        """
+        if questions_file is None:
+            questions_file = ACCIDENT_REPORT_DIR / "questionnaire" / "questions.json"
+        questions_file = str(questions_file)
+        
+        preloaded = _PRELOADED_SCHEMAS.get(questions_file)
+        if preloaded is None:
+            workflow = FormWorkflow(questions_file, interactive=False, web_ui_enabled=True)
+            preloaded = (workflow, workflow.compile_graph())
+            _PRELOADED_SCHEMAS[questions_file] = preloaded
+        return preloaded
+    
+    def __init__(self, room_id: str, questions_file: str = None, *, workflow=None, graph=None):
+        """Create a session for a room.
+        
+        A prebuilt workflow (and optionally its compiled graph) can be passed to share one
+        question tree between sessions. Each room still gets its own checkpoint thread.
+        """
         self.room_id = room_id
         self.is_active = False
         self.current_state = None
@@ -90,8 +142,11 @@ class WebBotSession:
         
         self.questions_file = str(questions_file)
         
+        if workflow is not None:
+            self.workflow = workflow
+            self.graph = graph if graph is not None else workflow.compile_graph()
         # Initialize the workflow if possible
-        if BOT_IMPORTS_SUCCESSFUL and FormWorkflow and os.path.exists(self.questions_file):
+        elif BOT_IMPORTS_SUCCESSFUL and FormWorkflow and os.path.exists(self.questions_file):
             try:
                 self.workflow = FormWorkflow(self.questions_file, interactive=False, web_ui_enabled=True)
                 self.graph = self.workflow.compile_graph()
@@ -117,9 +172,9 @@ class WebBotSession:
             # Initialize the bot state
             initial_state = {}
             
-            # Run the workflow until it reaches ask_question (in web mode, this is where it ends)
+            # Run the workflow until it reaches get_user_input (in web mode, this is where it pauses)
             for event in self.graph.stream(initial_state, config=self.config):
-                # In web mode, workflow should stop after ask_question
+                # In web mode, workflow is interrupted after ask_question
                 pass
             
             # Get the current state after asking the first question
@@ -141,8 +196,11 @@ class WebBotSession:
             self.is_active = False
             return f"❌ Failed to start bot: {str(e)}"
     
-    def process_message(self, user_message: str) -> Optional[str]:
-        """Process a user message and return the bot's response."""
+    def process_message(self, user_message: str, raw: bool = False) -> Union[Optional[str], ProcessResult]:
+        """Process a user message and return the bot's response.
+        
+        With raw=True a ProcessResult is returned instead and no reply text is rendered.
+        """
         if not self.is_active or not self.workflow or not self.graph:
             return None
         
@@ -150,140 +208,75 @@ class WebBotSession:
             # Get current state
             current_state_obj = self.graph.get_state(self.config)
             if not current_state_obj or not current_state_obj.values:
-                return "❌ Bot session lost. Please restart the bot."
-            
-            state_values = current_state_obj.values
-            
-            # Add user message to the state and create updated state for validation
-            from langchain_core.messages import HumanMessage
-            updated_state = {
-                **state_values,
-                "messages": state_values.get("messages", []) + [HumanMessage(content=user_message)]
-            }
-            
-            # Manually run validate_input node
-            new_state = self.workflow.validate_input(updated_state)
-            
-            # Update the graph state with the validation result
-            self.graph.update_state(self.config, new_state)
-            
-            # Get the routing decision from validate_input
-            route = self.workflow.route_after_validation(new_state)
-            
-            # Handle the routing decision
-            if route == "retry":
-                # Validation failed, re-ask the question
-                ask_result = self.workflow.ask_question(new_state)
-                self.graph.update_state(self.config, ask_result)
-                self.current_state = ask_result  # Update current state
-                response = self._get_current_response()
-                return response
-                
-            elif route == "next_question":
-                # Move to next question
-                advance_result = self.workflow.advance_to_next(new_state)
-                self.graph.update_state(self.config, advance_result)
-                ask_result = self.workflow.ask_question(advance_result)
-                self.graph.update_state(self.config, ask_result)
-                self.current_state = ask_result  # Update current state
-                response = self._get_current_response()
-                return response
-                
-            elif route == "followup":
-                # Handle followup question
-                followup_result = self.workflow.handle_followup(new_state)
-                self.graph.update_state(self.config, followup_result)
-                ask_result = self.workflow.ask_question(followup_result)
-                self.graph.update_state(self.config, ask_result)
-                self.current_state = ask_result  # Update current state
-                response = self._get_current_response()
-                return response
-                
-            elif route == "group":
-                # Continue with group question
-                group_result = self.workflow.handle_group_question(new_state)
-                self.graph.update_state(self.config, group_result)
-                ask_result = self.workflow.ask_question(group_result)
-                self.graph.update_state(self.config, ask_result)
-                self.current_state = ask_result  # Update current state
-                response = self._get_current_response()
-                return response
-                
-            elif route == "group_complete":
-                # Complete the group and move to next
-                group_result = self.workflow.handle_group_question(new_state)
-                self.graph.update_state(self.config, group_result)
-                
-                # Check if form is complete
-                if group_result.get("current_question_index", 0) >= len(self.workflow.questions) - 1:
-                    complete_result = self.workflow.complete_form(group_result)
-                    self.graph.update_state(self.config, complete_result)
-                    self.is_active = False
-                    return self._generate_completion_message()
-                else:
-                    # Advance to next question
-                    advance_result = self.workflow.advance_to_next(group_result)
-                    self.graph.update_state(self.config, advance_result)
-                    ask_result = self.workflow.ask_question(advance_result)
-                    self.graph.update_state(self.config, ask_result)
-                    self.current_state = ask_result  # Update current state
-                    response = self._get_current_response()
-                    return response
-                    
-            elif route == "repeat_group":
-                # Continue with repeat group question
-                repeat_result = self.workflow.handle_repeat_group(new_state)
-                self.graph.update_state(self.config, repeat_result)
-                ask_result = self.workflow.ask_question(repeat_result)
-                self.graph.update_state(self.config, ask_result)
-                self.current_state = ask_result  # Update current state
-                response = self._get_current_response()
-                return response
-                
-            elif route == "repeat_group_complete":
-                # Complete the repeat group instance and handle next steps
-                repeat_result = self.workflow.handle_repeat_group(new_state)
-                self.graph.update_state(self.config, repeat_result)
-                
-                # Check if we're still in the repeat group (more vehicles to add)
-                if repeat_result.get("current_repeat_group_question"):
-                    # Continue with next vehicle
-                    ask_result = self.workflow.ask_question(repeat_result)
-                    self.graph.update_state(self.config, ask_result)
-                    self.current_state = ask_result  # Update current state
-                    response = self._get_current_response()
-                    return response
-                else:
-                    # Repeat group is complete, check if form is complete
-                    if repeat_result.get("current_question_index", 0) >= len(self.workflow.questions) - 1:
-                        complete_result = self.workflow.complete_form(repeat_result)
-                        self.graph.update_state(self.config, complete_result)
-                        self.is_active = False
-                        return self._generate_completion_message()
-                    else:
-                        # Advance to next question
-                        advance_result = self.workflow.advance_to_next(repeat_result)
-                        self.graph.update_state(self.config, advance_result)
-                        ask_result = self.workflow.ask_question(advance_result)
-                        self.graph.update_state(self.config, ask_result)
-                        self.current_state = ask_result  # Update current state
-                        response = self._get_current_response()
-                        return response
-                    
-            elif route == "complete":
-                # Form is complete
-                complete_result = self.workflow.complete_form(new_state)
-                self.graph.update_state(self.config, complete_result)
-                self.is_active = False
-                return self._generate_completion_message()
+                return self._session_lost_response(raw)
             
-            return "❌ Something went wrong processing your response. Please try again."
+            return self._advance(user_message, raw)
             
         except Exception as e:
-            print(f"❌ Error processing message: {e}")
-            import traceback
-            traceback.print_exc()
-            return f"❌ Error: {str(e)}. Please try again or restart the bot."
+            return self._error_response(e, raw)
+    
+    def process_batch(self, user_messages: List[str], raw: bool = False) -> List[Union[Optional[str], ProcessResult]]:
+        """Process several user messages in order and return one response per processed message.
+        
+        The session is checked once for the whole batch; processing stops early once the form is complete.
+        With raw=True each response is a ProcessResult, as for process_message.
+        """
+        if not self.is_active or not self.workflow or not self.graph:
+            return []
+        
+        try:
+            current_state_obj = self.graph.get_state(self.config)
+            if not current_state_obj or not current_state_obj.values:
+                return [self._session_lost_response(raw)]
+        except Exception as e:
+            return [self._error_response(e, raw)]
+        
+        responses = []
+        for user_message in user_messages:
+            if not self.is_active:
+                break
+            try:
+                responses.append(self._advance(user_message, raw))
+            except Exception as e:
+                responses.append(self._error_response(e, raw))
+        return responses
+    
+    def _advance(self, user_message: str, raw: bool = False) -> Union[Optional[str], ProcessResult]:
+        """Resume the paused workflow with one message and return the bot's reply (or a ProcessResult if raw)."""
+        # Resume the interrupted workflow with the user's message; it runs
+        # through validation and routing until it pauses at the next question
+        for event in self.graph.stream(Command(resume=user_message), config=self.config):
+            pass
+        
+        self.current_state = self.graph.get_state(self.config).values
+        
+        if self.current_state.get("form_complete"):
+            self.is_active = False
+            return ProcessResult(ResponseStatus.DONE) if raw else self._generate_completion_message()
+        
+        if raw:
+            # A pending error is what the rendered reply shows as "❌ ... Please try again"
+            status = ResponseStatus.INVALID if self.current_state.get("last_error") else ResponseStatus.OK
+            return ProcessResult(status, self.current_state.get("current_question_id"))
+        
+        return self._get_current_response()
+    
+    @staticmethod
+    def _session_lost_response(raw: bool = False) -> Union[str, ProcessResult]:
+        """Build the reply for a session whose checkpoint state is gone."""
+        if raw:
+            return ProcessResult(ResponseStatus.ERROR)
+        return "❌ Bot session lost. Please restart the bot."
+    
+    @staticmethod
+    def _error_response(error: Exception, raw: bool = False) -> Union[str, ProcessResult]:
+        """Log a processing error and build the reply shown to the user (or a ProcessResult if raw)."""
+        print(f"❌ Error processing message: {error}")
+        import traceback
+        traceback.print_exc()
+        if raw:
+            return ProcessResult(ResponseStatus.ERROR)
+        return f"❌ Error: {str(error)}. Please try again or restart the bot."
     
     def stop(self) -> str:
         """Stop the bot session."""
@@ -351,15 +344,7 @@ class WebBotSession:
                 
                 # Add choices for multiple choice questions
                 if field["type"] in ["single_choice", "multiple_choice"]:
-                    options = field.get("options", [])
-                    if options:
-                        choices_text = "\n".join([f"• {choice}" for choice in options])
-                        question_text += f"\n\n**Options:**\n{choices_text}"
-                    
-                    if field.get("other_specify"):
-                        question_text += "\n*(You can also specify 'Other' with details)*"
-                    if field["type"] == "multiple_choice":
-                        question_text += "\n*(You can select multiple options separated by commas)*"
+                    question_text += self._format_choices(field)
                 
                 return question_text
         
@@ -374,15 +359,7 @@ class WebBotSession:
                 
                 # Add choices for multiple choice questions
                 if field["type"] in ["single_choice", "multiple_choice"]:
-                    options = field.get("options", [])
-                    if options:
-                        choices_text = "\n".join([f"• {choice}" for choice in options])
-                        question_text += f"\n\n**Options:**\n{choices_text}"
-                    
-                    if field.get("other_specify"):
-                        question_text += "\n*(You can also specify 'Other' with details)*"
-                    if field["type"] == "multiple_choice":
-                        question_text += "\n*(You can select multiple options separated by commas)*"
+                    question_text += self._format_choices(field)
                 
                 return question_text
         
@@ -412,15 +389,7 @@ class WebBotSession:
                     
                     # Add choices for multiple choice questions
                     elif question["type"] in ["single_choice", "multiple_choice"]:
-                        options = question.get("options", [])
-                        if options:
-                            choices_text = "\n".join([f"• {choice}" for choice in options])
-                            question_text += f"\n\n**Options:**\n{choices_text}"
-                        
-                        if question.get("other_specify"):
-                            question_text += "\n*(You can also specify 'Other' with details)*"
-                        if question["type"] == "multiple_choice":
-                            question_text += "\n*(You can select multiple options separated by commas)*"
+                        question_text += self._format_choices(question)
                     
                     # Add format hints for other question types
                     elif question["type"] == "date":
@@ -438,6 +407,21 @@ class WebBotSession:
         
         return None
     
+    @staticmethod
+    def _format_choices(question: Dict[str, Any]) -> str:
+        """Format the options list and other/multiple hints of a choice question."""
+        choices_text = ""
+        options = question.get("options", [])
+        if options:
+            choices_text = "\n".join([f"• {choice}" for choice in options])
+            choices_text = f"\n\n**Options:**\n{choices_text}"
+        
+        if question.get("other_specify"):
+            choices_text += "\n*(You can also specify 'Other' with details)*"
+        if question["type"] == "multiple_choice":
+            choices_text += "\n*(You can select multiple options separated by commas)*"
+        return choices_text
+    
     def _get_current_response(self) -> Optional[str]:
         """Generate response based on current state."""
         if not self.current_state:
@@ -449,7 +433,7 @@ class WebBotSession:
             if hasattr(last_message, 'content'):
                 try:
                     # Try to parse as JSON - if successful, it's a UI message
-                    ui_message = json.loads(last_message.content)
+                    ui_message = _json_loads(last_message.content)
                     if isinstance(ui_message, dict) and ui_message.get("sender") == "bot":
                         # This is a UI message, return it as-is for the frontend to handle
                         return last_message.content